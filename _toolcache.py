@@ -0,0 +1,113 @@
+"""
+Android SDK 工具路径的磁盘缓存
+
+config.resolve_sdk_tool 需要遍历各 SDK 的 build-tools 目录，结果只在进程内缓存；
+这里把解析结果写入 $XDG_CACHE_HOME/apkrepack/toolpaths.json，之后的进程只需 stat 一次 build-tools 目录、
+读取一次 JSON 即可得到工具路径。
+
+缓存以 SDK_ENV_VARS / SDK_FS_PATHS 解析出的 SDK 目录及其 build-tools 目录的 mtime/size 为键
+（安装或删除 build-tools 版本会改变目录 mtime），每条记录另外保存工具文件自身的 mtime，文件被删除或替换时视为未命中。
+"""
+
+import functools
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from config import _sdk_roots, get_config, resolve_sdk_tool
+
+_CACHE_VERSION = 1
+
+
+def _cache_path() -> str:
+    """缓存文件路径"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'apkrepack', 'toolpaths.json')
+
+
+def _sdk_key() -> str:
+    """当前 SDK 配置的缓存键"""
+    parts: list = [_CACHE_VERSION]
+    for root in _sdk_roots(get_config()):
+        try:
+            st = os.stat(os.path.join(root, 'build-tools'))
+        except OSError:
+            continue
+        parts.append([root, st.st_mtime_ns, st.st_size])
+    return hashlib.sha1(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def load_cache(key: Optional[str] = None) -> Dict[str, str]:
+    """
+    读取缓存中仍然有效的工具路径
+
+    Args:
+        key: 缓存键，默认按当前 SDK 配置计算
+
+    Returns:
+        工具名 -> 绝对路径；缓存不存在、已损坏或键不匹配时为空
+    """
+    key = key or _sdk_key()
+    try:
+        with open(_cache_path(), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('key') != key:
+        return {}
+
+    tools = {}
+    for name, entry in (data.get('tools') or {}).items():
+        try:
+            path, mtime_ns = entry
+            if os.stat(path).st_mtime_ns == mtime_ns:
+                tools[name] = path
+        except (OSError, TypeError, ValueError):
+            continue
+    return tools
+
+
+def _save_cache(key: str, tools: Dict[str, str]) -> None:
+    """原子写入缓存（并发的重打包进程不会读到写了一半的文件），写入失败时忽略"""
+    cache_path = _cache_path()
+    entries = {}
+    for name, path in tools.items():
+        try:
+            entries[name] = [path, os.stat(path).st_mtime_ns]
+        except OSError:
+            continue
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'tools': entries}, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+@functools.lru_cache(maxsize=None)
+def cached_tool(name: str) -> Optional[str]:
+    """
+    获取 SDK 工具路径，优先使用磁盘缓存，未命中时调用 resolve_sdk_tool 解析并写回缓存
+
+    Args:
+        name: 工具名，如 "apksigner"、"zipalign"、"d8"
+
+    Returns:
+        工具的绝对路径，找不到时为 None
+    """
+    key = _sdk_key()
+    tools = load_cache(key)
+    if name in tools:
+        return tools[name]
+
+    path = resolve_sdk_tool(name)
+    if path:
+        tools[name] = path
+        _save_cache(key, tools)
+    return path
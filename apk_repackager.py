@@ -6,12 +6,89 @@ APK 自动重打包工具
 
 import os
 import sys
+import asyncio
+import collections
+import contextlib
+import functools
+import hashlib
+import json
+import locale
+import logging
+import logging.handlers
+import mmap
+import queue
 import subprocess
+import tempfile
 import zipfile
 import shutil
+import stat
+import time
+import uuid
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-import config
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple, Union
+from config import SIGN_ARGS, ConfigError, PackingStrategy, SignMode, get_config, resolve_sdk_tool
+from _toolcache import cached_tool
+import apk_signer
+
+try:
+    # Intel ISA-L 的 DEFLATE 实现（SIMD 优化），压缩速度约为 zlib 的 2-3 倍
+    from isal import isal_zlib
+except ImportError:  # pragma: no cover - 可选依赖
+    isal_zlib = None
+
+# ZIP 条目使用标准 CRC-32；ISA-L / libdeflate 的实现基于 PCLMUL 指令，比 zlib 的查表实现快，
+# 按可用性依次选择
+if isal_zlib is not None:
+    _crc32 = isal_zlib.crc32
+else:
+    try:
+        from deflate import crc32 as _crc32
+    except ImportError:  # pragma: no cover - 可选依赖
+        _crc32 = zlib.crc32
+
+
+log = logging.getLogger("apkrepkg")
+# 作为库使用且调用方未配置日志时不输出任何内容（命令行入口由 _setup_logging 配置）
+log.addHandler(logging.NullHandler())
+
+
+def _setup_logging(level: int = logging.INFO, queued: bool = False) -> Optional[logging.handlers.QueueListener]:
+    """
+    配置命令行日志输出（stderr，格式与原先的 "[INFO] ..." 一致）
+
+    Args:
+        level: 日志级别
+        queued: 批量模式下使用 QueueHandler，日志由单独的线程写出，
+                并发任务记录日志时只需入队，不争用输出流
+
+    Returns:
+        queued 为 True 时返回已启动的 QueueListener，调用方负责 stop()
+    """
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    log.setLevel(level)
+    log.propagate = False
+    log.handlers.clear()
+
+    if not queued:
+        log.addHandler(handler)
+        return None
+
+    log_queue = queue.SimpleQueue()
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+def _flush_log(listener: Optional[logging.handlers.QueueListener]) -> None:
+    """等待 QueueListener 写出已入队的日志（批量命令打印结果前调用，保证输出顺序）"""
+    if listener is not None:
+        listener.stop()
+        listener.start()
 
 
 class ApkRepkgError(Exception):
@@ -19,6 +96,754 @@ class ApkRepkgError(Exception):
     pass
 
 
+def _stat_is(path: str, mode_test) -> bool:
+    """
+    对路径执行一次 stat 并用 stat.S_ISDIR/S_ISREG 等判断类型
+
+    Args:
+        path: 文件或目录路径
+        mode_test: stat 模块中的类型判断函数
+
+    Returns:
+        路径存在且类型匹配时返回 True
+    """
+    try:
+        return mode_test(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
+# apktool 在反编译目录内生成的中间产物目录，不参与输入指纹计算
+_APKTOOL_OUTPUT_DIRS = frozenset(('build', 'dist'))
+
+# 增量打包缓存文件名（位于输出APK所在目录）
+_BUILD_CACHE_FILE = '.apkrepkg_cache.json'
+
+
+def _tree_fingerprint(input_dir: str, salt: str = '') -> Tuple[str, int]:
+    """
+    计算目录树的指纹（基于相对路径、文件大小和修改时间，不读取文件内容）
+
+    Args:
+        input_dir: 目录路径
+        salt: 额外参与哈希的内容（如 apktool 版本信息）
+
+    Returns:
+        (十六进制指纹, 文件总字节数)
+    """
+    digest = hashlib.blake2b(salt.encode('utf-8'), digest_size=16)
+    total_size = 0
+    stack = [(input_dir, '')]
+    while stack:
+        path, prefix = stack.pop()
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            relpath = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not prefix and entry.name in _APKTOOL_OUTPUT_DIRS:
+                    continue
+                stack.append((entry.path, relpath + '/'))
+            else:
+                st = entry.stat(follow_symlinks=False)
+                total_size += st.st_size
+                digest.update(f'{relpath}\0{st.st_size}\0{st.st_mtime_ns}\n'.encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest(), total_size
+
+
+# ZIP 方式打包时跳过的目录（任意层级），以 "." 开头的文件和目录也会跳过
+_ZIP_SKIP_DIRS = frozenset(('__MACOSX', 'META-INF'))
+
+
+# ZIP 方式打包时以 STORE 方式存储（不压缩）的文件：已压缩的格式，以及需要 mmap 直接读取的文件
+_STORE_FILENAMES = frozenset(('resources.arsc', 'AndroidManifest.xml'))
+
+
+def _store_extensions() -> frozenset:
+    """
+    按配置的打包策略得到以 STORE 方式存储的扩展名集合（不含点，小写）
+
+    PASSTHROUGH: ZIP_STORE_EXTENSIONS 中的已压缩格式原样存储；ALL: 全部压缩（_STORE_FILENAMES 除外）
+    """
+    cfg = get_config()
+    if cfg.zip_packing_strategy is PackingStrategy.ALL:
+        return frozenset()
+    return frozenset(ext.lstrip('.').lower() for ext in cfg.zip_store_extensions)
+
+
+def _is_stored(filename: str, store_extensions: frozenset) -> bool:
+    """判断文件是否以 STORE 方式存储（filename 为不含目录的文件名）"""
+    _, dot, ext = filename.rpartition('.')
+    return (bool(dot) and ext.lower() in store_extensions) or filename in _STORE_FILENAMES
+
+
+def _compress_levels(fast: bool = False) -> Tuple[int, Dict[str, int]]:
+    """
+    按配置得到 ZIP 方式打包的压缩级别
+
+    Args:
+        fast: 快速打包，压缩的条目一律使用级别 1（ZIP_LEVEL_BY_EXT 中为 0 的仍以 STORE 方式存储）
+
+    Returns:
+        (默认级别, 扩展名（不含点，小写） -> 压缩级别)
+    """
+    cfg = get_config()
+    levels = {ext.lstrip('.').lower(): level for ext, level in cfg.zip_level_by_ext.items()}
+    if fast:
+        return 1, {ext: min(level, 1) for ext, level in levels.items()}
+    return cfg.zip_compress_level, levels
+
+
+def _entry_level(filename: str, store_extensions: frozenset, default_level: int,
+                 levels: Dict[str, int]) -> int:
+    """条目的压缩级别，0 表示以 STORE 方式存储（filename 为不含目录的文件名）"""
+    if _is_stored(filename, store_extensions):
+        return 0
+    _, dot, ext = filename.rpartition('.')
+    return levels.get(ext.lower(), default_level) if dot else default_level
+
+
+def _iter_apk_entries(input_dir: str, fast: bool = False) -> Iterator[Tuple[str, str, int]]:
+    """
+    遍历 ZIP 方式打包的输入目录（基于 os.scandir，每个文件不额外 stat）
+
+    7z 和 zipfile 两种打包方式共用，与 os.walk 自顶向下的顺序相同：
+    先输出当前目录的文件，再依次进入子目录。
+
+    Args:
+        input_dir: 解压后的APK目录路径
+        fast: 快速打包，见 _compress_levels
+
+    Returns:
+        (文件路径, ZIP 内条目名, 压缩级别) 迭代器，条目名使用 "/" 分隔，级别 0 表示以 STORE 方式存储
+    """
+    store_extensions = _store_extensions()
+    default_level, levels = _compress_levels(fast)
+    stack = [(input_dir, '')]
+    while stack:
+        path, prefix = stack.pop()
+        subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    # 与 os.walk 相同，不进入指向目录的符号链接
+                    if name not in _ZIP_SKIP_DIRS and not entry.is_symlink():
+                        subdirs.append((entry.path, prefix + name + '/'))
+                else:
+                    yield entry.path, prefix + name, _entry_level(name, store_extensions, default_level, levels)
+        stack.extend(reversed(subdirs))
+
+
+def _load_build_cache(cache_path: str) -> dict:
+    """读取增量打包缓存，文件不存在或损坏时返回空字典"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _output_signature(output_apk: str) -> Optional[List[int]]:
+    """打包产物的 [大小, 修改时间(ns)]，文件不存在时为 None"""
+    try:
+        st = os.stat(output_apk)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _save_build_cache(cache_path: str, cache: dict) -> None:
+    """原子写入增量打包缓存"""
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, cache_path)
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_executable(name: str) -> str:
+    """
+    将命令名解析为绝对路径（在 PATH 中查找），找不到时原样返回
+
+    CPython 只在可执行文件为带目录的路径时才使用 posix_spawn 启动子进程。
+    """
+    if os.path.dirname(name):
+        return name
+    return shutil.which(name) or name
+
+
+@functools.lru_cache(maxsize=64)
+def _tool_exists(path: str) -> bool:
+    """
+    工具文件是否存在（结果缓存，批量处理时不重复 stat）
+
+    不带目录的命令名（如 "zipalign"）在 PATH 中查找。
+    """
+    return os.path.isfile(_resolve_executable(path))
+
+
+def _existing_files(paths: Sequence[str]) -> FrozenSet[str]:
+    """
+    批量判断工具文件是否存在
+
+    同一目录下有多个路径时只 scandir 一次该目录（如 ./tools 下的 apktool/baksmali/smali），
+    按文件名匹配；单独的路径和不带目录的命令名逐个用 _tool_exists 检查。
+
+    Args:
+        paths: 工具路径列表
+
+    Returns:
+        存在的路径集合
+    """
+    by_dir = collections.defaultdict(list)
+    for path in paths:
+        by_dir[os.path.dirname(path)].append(path)
+
+    found = set()
+    for directory, group in by_dir.items():
+        if not directory or len(group) == 1:
+            found.update(path for path in group if _tool_exists(path))
+            continue
+        try:
+            with os.scandir(directory) as it:
+                names = {os.path.normcase(entry.name) for entry in it if entry.is_file()}
+        except OSError:
+            continue
+        found.update(path for path in group if os.path.normcase(os.path.basename(path)) in names)
+    return frozenset(found)
+
+
+def clear_tool_cache() -> None:
+    """清除工具路径缓存（运行期间安装了工具或修改了 apkrepack.yml 中的工具路径后调用）"""
+    get_config.cache_clear()
+    resolve_sdk_tool.cache_clear()
+    _jvm_opts.cache_clear()
+    _ensure_cds_dir.cache_clear()
+    _java_cmd.cache_clear()
+    cached_tool.cache_clear()
+    _tool_exists.cache_clear()
+    _resolve_executable.cache_clear()
+    _resolve_d8.cache_clear()
+
+
+def _sdk_tool(path: str, name: str) -> str:
+    """
+    配置的工具路径不存在时改用 Android SDK build-tools 中的同名工具
+
+    Args:
+        path: 配置的工具路径
+        name: SDK 中的工具名
+
+    Returns:
+        可用的工具路径；SDK 中也找不到时原样返回配置值
+    """
+    if _tool_exists(path):
+        return path
+    return cached_tool(name) or path
+
+
+@functools.lru_cache(maxsize=64)
+def _jvm_opts(jar_path: str) -> Tuple[str, ...]:
+    """
+    运行 jar 工具的通用 JVM 参数（每个 jar 只计算一次，不访问文件系统）
+
+    启用 AppCDS 时为每个 jar 使用独立的共享归档文件，JVM 首次运行时自动生成，
+    后续启动复用，省去类加载与校验的开销。归档目录由 _ensure_cds_dir 在启动 JVM 前创建。
+
+    Args:
+        jar_path: jar 文件路径
+
+    Returns:
+        JVM 参数
+    """
+    cfg = get_config()
+    if not cfg.java_cds_enabled:
+        return ()
+    archive = os.path.join(cfg.java_cds_dir, os.path.splitext(os.path.basename(jar_path))[0] + '.jsa')
+    return (
+        "-XX:+IgnoreUnrecognizedVMOptions",
+        "-XX:+AutoCreateSharedArchive",
+        f"-XX:SharedArchiveFile={archive}",
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _ensure_cds_dir() -> None:
+    """启用 AppCDS 时创建共享归档目录（在启动 jar 工具的 JVM 之前调用，进程内只创建一次）"""
+    cfg = get_config()
+    if cfg.java_cds_enabled:
+        os.makedirs(cfg.java_cds_dir, exist_ok=True)
+
+
+@functools.lru_cache(maxsize=64)
+def _java_cmd(jar_path: str) -> Tuple[str, ...]:
+    """
+    构建 java -jar 命令前缀（按 jar 缓存，批量签名/转换时不重复拼装）
+
+    d8、smali/baksmali、apksigner.jar 都经由这里启动，共用 JAVA_PATH 和 AppCDS 配置
+    （apktool 需要在中间插入堆参数，在 __init__ 中用 _jvm_opts 单独拼装）。
+
+    Args:
+        jar_path: jar 文件路径
+
+    Returns:
+        命令前缀
+    """
+    return (get_config().java_path, *_jvm_opts(jar_path), "-jar", jar_path)
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_d8() -> Tuple[str, ...]:
+    """
+    d8 命令前缀（含 --lib android.jar），首次调用时解析后缓存
+
+    配置项 d8_path 为 .jar 时通过 java -jar 启动，否则（d8 / d8.bat / d8.exe）直接调用。
+    只在即将运行 d8 时调用，jar 方式同时创建 AppCDS 归档目录。
+    """
+    d8_path = _sdk_tool(get_config().d8_path, 'd8')
+    if d8_path.endswith('.jar'):
+        _ensure_cds_dir()
+        d8_cmd = list(_java_cmd(d8_path))
+    else:
+        d8_cmd = [d8_path]
+
+    # 添加 android.jar 作为 boot classpath
+    android_jar = get_config().android_jar_path
+    if android_jar and _tool_exists(android_jar):
+        d8_cmd.extend(['--lib', android_jar])
+    return tuple(d8_cmd)
+
+
+def _partition_cpus(workers: int) -> List[Optional[List[int]]]:
+    """
+    将当前进程可用的 CPU 核切分为 workers 组连续的核
+
+    Args:
+        workers: 并发任务数
+
+    Returns:
+        每个并发槽位的 CPU 核列表；不支持绑核（非 Linux、无 taskset 或配置关闭）时均为 None
+    """
+    if (not get_config().batch_pin_cpus
+            or not hasattr(os, 'sched_getaffinity') or not shutil.which('taskset')):
+        return [None] * workers
+
+    cpus = sorted(os.sched_getaffinity(0))
+    if workers > len(cpus):
+        return [None] * workers
+    size, extra = divmod(len(cpus), workers)
+    groups = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(cpus[start:end])
+        start = end
+    return groups
+
+
+async def _gather_all(aws) -> list:
+    """
+    并发执行多个任务，任一失败时取消其余任务并等待其结束后再抛出异常
+
+    直接使用 asyncio.gather 时，失败后其余任务会留给 asyncio.run 在退出时统一取消，
+    此时正在创建的子进程无法被正常清理。
+
+    Args:
+        aws: 协程列表
+
+    Returns:
+        与输入顺序一致的结果列表
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+# apksigner 使用的对齐扩展字段：ID(2) + 长度(2) + 对齐值(2)，后跟填充字节
+_ALIGNMENT_EXTRA_ID = 0xd935
+_ALIGNMENT_EXTRA_SIZE = 6
+
+
+def _readahead(file_path: str) -> None:
+    """
+    提示内核异步预读文件（posix_fadvise WILLNEED），不阻塞调用方
+
+    文件在线程池排队等待压缩期间由内核读入页缓存，工作线程读取时不再等待磁盘。
+    不支持的平台上不做任何事。
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _deflate_wbits(size: int) -> int:
+    """
+    按数据大小确定 zlib 的窗口大小
+
+    反编译目录中大多是几百字节到几KB的 XML，zlib 默认为每个压缩对象分配 32KB 窗口，
+    初始化开销超过压缩本身。窗口不小于数据长度（加上 zlib 的 262 字节前瞻区）时
+    输出与默认参数完全相同。memLevel 保持默认的 8：减小它会同时缩小 zlib 的
+    符号缓冲区，改变块的划分位置，输出不再相同（通常略大）。
+
+    Args:
+        size: 待压缩数据的字节数
+
+    Returns:
+        wbits，负数表示原始 DEFLATE 流
+    """
+    return -min(15, max(9, (size + 262).bit_length()))
+
+
+def _compress_entry(file_path: str, arcname: str, compress_type: int, level: int,
+                    st: os.stat_result) -> Tuple[zipfile.ZipInfo, Union[bytes, str]]:
+    """
+    读取文件并计算 CRC，按需压缩为原始 DEFLATE 数据（在工作线程中执行）
+
+    未压缩的条目（通常是最大的 .so/.dex/图片）不读入内存：CRC 在内存映射上一次算完，
+    数据由 _write_compressed 在内核中直接拷贝。
+
+    Args:
+        file_path: 文件路径
+        arcname: ZIP 内的条目名
+        compress_type: zipfile.ZIP_STORED 或 zipfile.ZIP_DEFLATED
+        level: 压缩级别
+        st: 收集文件列表时得到的 os.stat 结果（用于修改时间和权限，不再重复 stat）
+
+    Returns:
+        (已填好 CRC 和大小的 ZipInfo, 写入 ZIP 的数据；未压缩条目为源文件路径)
+    """
+    # 与 ZipInfo.from_file 相同，ZIP 时间戳不能早于 1980 年
+    date_time = max(time.localtime(st.st_mtime)[:6], (1980, 1, 1, 0, 0, 0))
+    zinfo = zipfile.ZipInfo(arcname, date_time)
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.compress_type = compress_type
+    if compress_type == zipfile.ZIP_STORED:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    zinfo.CRC = _crc32(mm)
+            else:
+                zinfo.CRC = 0
+        zinfo.file_size = zinfo.compress_size = size
+        return zinfo, file_path
+
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    zinfo.file_size = len(data)
+    zinfo.CRC = _crc32(data)
+    if compress_type == zipfile.ZIP_DEFLATED:
+        # wbits=-15: 不带 zlib 头尾的原始 DEFLATE 流，与 ZIP 条目格式一致。
+        # ISA-L 最高级别为 3（压缩率约等于 zlib 6），已安装时优先使用
+        if isal_zlib is not None:
+            compressor = isal_zlib.compressobj(min(level, isal_zlib.ISAL_BEST_COMPRESSION),
+                                               isal_zlib.DEFLATED, -15)
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, _deflate_wbits(len(data)))
+        data = compressor.compress(data) + compressor.flush()
+    zinfo.compress_size = len(data)
+    return zinfo, data
+
+
+# zipalign -p 的内存页对齐字节数
+_PAGE_ALIGNMENT = 4096
+
+
+def _alignment_rule() -> Tuple[int, int]:
+    """
+    按配置得到未压缩条目的对齐字节数（与 zipalign 调用参数一致）
+
+    Returns:
+        (普通条目, .so 条目)；ZIPALIGN_PAGE_ALIGN_SO 关闭时 .so 与普通条目相同
+    """
+    cfg = get_config()
+    return cfg.zipalign_bytes, (_PAGE_ALIGNMENT if cfg.zipalign_page_align_so else cfg.zipalign_bytes)
+
+
+def _write_compressed(zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, payload: Union[bytes, str],
+                      alignment: Optional[Tuple[int, int]] = None) -> None:
+    """
+    将已压缩好的数据作为一个条目写入 ZipFile
+
+    zipfile 没有写入预压缩数据的公开接口，这里按 ZipFile.writestr 的方式
+    维护文件列表和中央目录位置，关闭 ZipFile 时正常写出中央目录。
+
+    Args:
+        zf: 以写模式打开的 ZipFile
+        zinfo: 已填好 CRC 和大小的条目信息
+        payload: 条目数据，或需要原样拷贝的源文件路径
+        alignment: 未压缩条目的对齐规则 (普通条目, .so 条目)，见 _alignment_rule；None 不对齐
+    """
+    zinfo.header_offset = zf.fp.tell()
+    if alignment and zinfo.compress_type == zipfile.ZIP_STORED:
+        entry_alignment = alignment[1] if zinfo.filename.endswith('.so') else alignment[0]
+        # 与 apksigner 相同，在本地文件头的扩展字段中用 0xd935 字段填充
+        data_start = (zinfo.header_offset + zipfile.sizeFileHeader
+                      + len(zinfo.filename.encode('utf-8')) + _ALIGNMENT_EXTRA_SIZE)
+        pad = (-data_start) % entry_alignment
+        extra = zinfo.extra
+        zinfo.extra = struct.pack('<HHH', _ALIGNMENT_EXTRA_ID, 2 + pad, entry_alignment) + b'\0' * pad
+        zf.fp.write(zinfo.FileHeader())
+        # 填充只放在本地文件头中（与 zipalign 相同），关闭时写出的中央目录不带填充
+        zinfo.extra = extra
+    else:
+        zf.fp.write(zinfo.FileHeader())
+    if isinstance(payload, str):
+        _copy_file_into(zf.fp, payload, zinfo.compress_size)
+    else:
+        zf.fp.write(payload)
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+    zf.start_dir = zf.fp.tell()
+    zf._didModify = True
+
+
+# ZIP 方式打包时输出文件的写缓冲区大小
+_ZIP_WRITE_BUFFER = 4 * 1024 * 1024
+
+
+def _preallocate(out, size: int) -> None:
+    """
+    为输出文件预分配磁盘空间（posix_fallocate），不支持或空间不足时忽略
+
+    Args:
+        out: 新建的输出文件
+        size: 预分配的字节数
+    """
+    if size <= 0 or not hasattr(os, 'posix_fallocate'):
+        return
+    try:
+        os.posix_fallocate(out.fileno(), 0, size)
+    except OSError:
+        pass
+
+
+# 只有 Linux 的 sendfile 支持普通文件作为目标
+_USE_SENDFILE = sys.platform.startswith('linux') and hasattr(os, 'sendfile')
+
+
+def _copy_file_into(out, file_path: str, size: int) -> None:
+    """
+    将文件内容追加到已打开的输出文件中
+
+    Linux 上由内核通过 os.sendfile 直接在两个文件之间拷贝，数据不经过 Python。
+    与 shutil 相同只在 Linux 上使用：macOS / FreeBSD 的 sendfile 要求目标是套接字。
+
+    Args:
+        out: 以二进制写模式打开的输出文件（位于写入位置）
+        file_path: 源文件路径
+        size: 需要拷贝的字节数（计算 CRC 时的文件大小）
+    """
+    with open(file_path, 'rb') as src:
+        if not _USE_SENDFILE:
+            shutil.copyfileobj(src, out, 1024 * 1024)
+            return
+        out.flush()
+        start = out.tell()
+        offset = 0
+        while offset < size:
+            try:
+                sent = os.sendfile(out.fileno(), src.fileno(), offset, size - offset)
+            except OSError:
+                if offset:
+                    raise
+                # 第一次调用即失败（如文件系统不支持）时回退为普通复制
+                shutil.copyfileobj(src, out, 1024 * 1024)
+                return
+            if not sent:
+                break
+            offset += sent
+    if offset != size:
+        raise ApkRepkgError(f"文件在打包过程中被修改: {file_path}")
+    # sendfile 直接移动了底层文件描述符的位置，同步缓冲文件对象的位置
+    out.seek(start + size)
+
+
+# 签名方式的日志描述
+_SIGN_MODE_DESC = {
+    SignMode.V1_ONLY: "V1 签名 (JAR签名)",
+    SignMode.V2_ONLY: "V2 签名 (APK签名，体积更小)",
+    SignMode.V1_V2: "V1+V2 签名",
+}
+
+# 失败时错误信息保留的输出尾部行数
+_OUTPUT_TAIL_LINES = 200
+
+
+def _replace_file(src: str, dst: str) -> None:
+    """
+    用 src 覆盖 dst（同一文件系统上为原子重命名，跨文件系统时回退为复制）
+
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径（已存在时被覆盖）
+    """
+    try:
+        os.replace(src, dst)
+    except OSError:
+        # 跨文件系统（如系统临时目录与输出目录不在同一分区）：shutil.move 复制后删除源文件，
+        # Linux 上复制由 sendfile 在内核中完成
+        shutil.move(src, dst)
+
+
+# 中间文件目录的最小剩余空间，不足时直接在输出目录中处理
+_INTERMEDIATE_MIN_FREE = 1 << 30
+
+
+def _intermediate_dir() -> Optional[str]:
+    """
+    中间文件目录
+
+    配置项 intermediate_dir（默认 Linux 的 /dev/shm 内存文件系统）可用且空间充足时返回该目录，
+    中间文件的写入和重新读取不经过磁盘；否则返回 None。
+    """
+    work_dir = get_config().intermediate_dir
+    if not work_dir or not os.path.isdir(work_dir):
+        return None
+    try:
+        if shutil.disk_usage(work_dir).free < _INTERMEDIATE_MIN_FREE:
+            return None
+    except OSError:
+        return None
+    return work_dir
+
+
+def _intermediate_apk(output_apk: str) -> str:
+    """
+    重打包流程中间APK（打包→对齐→签名）的路径
+
+    Args:
+        output_apk: 最终输出APK路径
+
+    Returns:
+        中间APK路径（中间文件目录不可用时等于 output_apk）
+    """
+    work_dir = _intermediate_dir()
+    if work_dir is None:
+        return output_apk
+    return os.path.join(work_dir, f'apkrepkg_{uuid.uuid4().hex}.apk')
+
+
+def temp_workspace() -> tempfile.TemporaryDirectory:
+    """
+    创建临时工作目录（AAR/JAR 转 DEX 等解压和转换的中间文件）
+
+    优先放在中间文件目录（见 _intermediate_dir），否则使用系统临时目录；
+    以 with 语句使用，退出时删除，删除失败不抛出异常。
+    """
+    return tempfile.TemporaryDirectory(prefix=get_config().temp_dir_prefix, dir=_intermediate_dir(),
+                                       ignore_cleanup_errors=True)
+
+
+def _finish_intermediate(work_apk: str, output_apk: str) -> str:
+    """将处理完成的中间APK移动到输出路径，返回输出路径"""
+    output_apk = os.path.abspath(output_apk)
+    if os.path.abspath(work_apk) != output_apk:
+        os.makedirs(os.path.dirname(output_apk), exist_ok=True)
+        _replace_file(work_apk, output_apk)
+    return output_apk
+
+
+def _discard_intermediate(work_apk: str, output_apk: str) -> None:
+    """流程失败时删除残留的中间APK"""
+    if work_apk != output_apk and os.path.exists(work_apk):
+        os.remove(work_apk)
+
+
+def _decode_output(data: bytes) -> str:
+    """
+    解码外部工具的输出（仅在需要展示错误信息时调用）
+
+    工具输出使用系统默认编码（Windows 中文系统为 GBK），无法解码的字节用替换字符表示。
+    """
+    return data.decode(locale.getpreferredencoding(False), errors='replace')
+
+
+async def _run_async(cmd: Sequence[str], cwd: str = None, env: dict = None,
+                     fail_fast: bool = False, merge_stdout: bool = False) -> subprocess.CompletedProcess:
+    """
+    异步执行外部命令，逐行读取 stderr 并只保留尾部
+
+    工具输出（apktool/jarsigner 可能有数十MB）不会整体缓存在内存中，
+    只保留最后 _OUTPUT_TAIL_LINES 行用于错误信息。
+
+    Args:
+        cmd: 命令及参数
+        cwd: 工作目录
+        env: 环境变量（默认继承当前进程）
+        fail_fast: 读到包含 "error:" 的行时立即终止进程
+        merge_stdout: 同时收集 stdout（用于把错误写到 stdout 的工具，如 jarsigner）
+
+    Returns:
+        与 subprocess.run 相同结构的结果对象，stderr 为输出尾部文本，stdout 为空
+    """
+    # POSIX 下满足以下条件时 subprocess 使用 posix_spawn（vfork）而不是 fork+exec，
+    # 避免复制父进程页表：可执行文件为绝对路径、close_fds=False、未指定 cwd/preexec_fn。
+    # Python 创建的文件描述符默认不可继承（PEP 446），关闭 close_fds 不会泄漏到子进程
+    kwargs = {'close_fds': False} if os.name == 'posix' else {}
+    spawn = asyncio.ensure_future(asyncio.create_subprocess_exec(
+        _resolve_executable(cmd[0]), *cmd[1:],
+        stdout=asyncio.subprocess.PIPE if merge_stdout else asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.STDOUT if merge_stdout else asyncio.subprocess.PIPE,
+        cwd=cwd, env=env, limit=1024 * 1024, **kwargs
+    ))
+    try:
+        proc = await asyncio.shield(spawn)
+    except asyncio.CancelledError:
+        # 进程创建过程中被取消时 asyncio 的清理逻辑会永久等待未连接的管道，
+        # 因此屏蔽取消，等进程创建完成后再结束它
+        proc = await spawn
+        if proc.returncode is None:
+            proc.kill()
+        await proc.wait()
+        raise
+    stream = proc.stdout if merge_stdout else proc.stderr
+
+    tail = collections.deque(maxlen=_OUTPUT_TAIL_LINES)
+    try:
+        async for line in stream:
+            tail.append(line)
+            if fail_fast and b'error:' in line.lower():
+                proc.kill()
+                break
+        await proc.wait()
+    except BaseException:
+        # 任务被取消（如批量任务中其他任务失败）时结束子进程，避免遗留孤儿进程
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+
+    return subprocess.CompletedProcess(list(cmd), proc.returncode, '', _decode_output(b''.join(tail)))
+
+
+@functools.lru_cache(maxsize=1)
+def _jvm_default_heap() -> Optional[int]:
+    """JVM 默认的最大堆字节数（物理内存的 1/4），无法获取物理内存时为 None"""
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // 4
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
 class ApkRepkg:
     """APK重打包工具类"""
 
@@ -31,49 +856,172 @@ class ApkRepkg:
             apksigner_path: apksigner可执行文件路径，默认使用config.py中的配置
             zipalign_path: zipalign可执行文件路径，默认使用config.py中的配置
         """
-        self.apktool_path = apktool_path or config.APKTOOL_PATH
-        self.apksigner_path = apksigner_path or config.APKSIGNER_PATH
-        self.zipalign_path = zipalign_path or config.ZIPALIGN_PATH
+        self.apktool_path = apktool_path or get_config().apktool_path
+        self.apksigner_path = apksigner_path or _sdk_tool(get_config().apksigner_path, 'apksigner')
+        self.zipalign_path = zipalign_path or _sdk_tool(get_config().zipalign_path, 'zipalign')
+
+        # apktool 打包命令的不变部分，批量打包时避免每次重新拼装
+        # 如果是jar文件，使用java -jar运行；堆大小按输入目录大小在两者之间插入
+        self._apktool_is_jar = self.apktool_path.endswith('.jar')
+        if self._apktool_is_jar:
+            jvm_opts = get_config().apktool_jvm_opts
+            self._build_prefix = (get_config().java_path, *_jvm_opts(self.apktool_path), *jvm_opts)
+            self._build_suffix = ("-jar", self.apktool_path, "b")
+        else:
+            self._build_prefix = (self.apktool_path, "b")
+            self._build_suffix = ()
+
+        # 进程内签名的密钥缓存: (密钥库路径, 别名) -> apk_signer.SigningKey
+        self._signing_keys = {}
+
+    @functools.cached_property
+    def _tool_paths(self) -> Dict[str, str]:
+        """工具名 -> 路径"""
+        cfg = get_config()
+        return {
+            'java': cfg.java_path,
+            'apktool': self.apktool_path,
+            'apksigner': self.apksigner_path,
+            'zipalign': self.zipalign_path,
+            'd8': _sdk_tool(cfg.d8_path, 'd8'),
+            'baksmali': cfg.baksmali_path,
+            'smali': cfg.smali_path,
+        }
+
+    @functools.cached_property
+    def tools_available(self) -> FrozenSet[str]:
+        """路径存在的工具名集合（首次访问时检查一次，之后直接查集合；工具安装后需新建实例）"""
+        existing = _existing_files(list(self._tool_paths.values()))
+        return frozenset(name for name, path in self._tool_paths.items() if path in existing)
+
+    def require_tools(self, *names: str) -> None:
+        """
+        检查工具是否可用，缺少的工具一次性全部报告
+
+        jar 形式的工具同时要求 java 可用。
+
+        Args:
+            names: 工具名，见 _tool_paths
 
-    def build(self, input_dir: str, output_apk: str) -> str:
+        Raises:
+            ApkRepkgError: 有工具不可用
+        """
+        names = list(names)
+        if any(self._tool_paths[name].endswith('.jar') for name in names):
+            names.append('java')
+        missing = [name for name in dict.fromkeys(names) if name not in self.tools_available]
+        if missing:
+            details = ', '.join(f"{name} ({self._tool_paths[name]})" for name in missing)
+            raise ApkRepkgError(f"工具不可用，请检查 config.py 中的路径配置: {details}")
+
+    def build(self, input_dir: str, output_apk: str, force: bool = False, fast: bool = False) -> str:
         """
         重新打包APK
 
+        输入目录自上次成功打包后没有变化且输出APK仍存在时，直接跳过 apktool。
+
         Args:
             input_dir: 反编译后的目录路径
             output_apk: 输出APK路径
+            force: 忽略增量缓存，强制重新打包
+            fast: 快速打包（开发调试用），跳过 PNG 优化（apktool --no-crunch）
 
         Returns:
             打包后的APK文件路径
         """
+        return asyncio.run(self._build_async(input_dir, output_apk, force, fast=fast))
+
+    def _apktool_salt(self) -> str:
+        """apktool 版本标识（路径+大小+修改时间），apktool 升级后缓存自动失效"""
+        try:
+            st = os.stat(self.apktool_path)
+            return f'{os.path.abspath(self.apktool_path)}:{st.st_size}:{st.st_mtime_ns}'
+        except OSError:
+            return self.apktool_path
+
+    def _heap_opts(self, input_size: int) -> Tuple[str, ...]:
+        """
+        按反编译目录大小提高 apktool 的最大堆内存
+
+        堆过小时大型APK打包会频繁 Full GC；需要的堆取目录大小的 2 倍，
+        不超过配置项 apktool_max_heap_gb。只在结果大于 JVM 默认最大堆（物理内存的 1/4）时
+        添加 -Xmx，不会把堆调得比默认值更小；无法得知物理内存时不添加。
+
+        Args:
+            input_size: 反编译目录文件总字节数
+
+        Returns:
+            JVM 参数元组（非 jar 方式运行 apktool 或使用默认堆即可时为空）
+        """
+        if not self._apktool_is_jar:
+            return ()
+        default_heap = _jvm_default_heap()
+        if default_heap is None or input_size * 2 <= default_heap:
+            return ()
+        heap_gb = min(get_config().apktool_max_heap_gb, -(-input_size * 2 // (1 << 30)))
+        if heap_gb << 30 <= default_heap:
+            return ()
+        return (f"-Xmx{heap_gb}g",)
+
+    async def _build_async(self, input_dir: str, output_apk: str, force: bool = False,
+                           cpus: Sequence[int] = None, fast: bool = False,
+                           use_cache: bool = True) -> str:
+        """
+        build 的异步实现
+
+        Args:
+            cpus: 将 apktool 进程绑定到这些 CPU 核（Linux taskset，批量打包时使用）
+            fast: 快速打包，跳过 PNG 优化
+            use_cache: 读写增量打包缓存（输出为一次性中间文件时关闭）
+        """
         input_dir = os.path.abspath(input_dir)
         output_apk = os.path.abspath(output_apk)
 
-        if not os.path.isdir(input_dir):
+        if not _stat_is(input_dir, stat.S_ISDIR):
             raise ApkRepkgError(f"输入目录不存在: {input_dir}")
 
         manifest_path = os.path.join(input_dir, "AndroidManifest.xml")
-        if not os.path.isfile(manifest_path):
+        if not _stat_is(manifest_path, stat.S_ISREG):
             raise ApkRepkgError(f"AndroidManifest.xml 不存在: {input_dir}")
 
-        # 如果是jar文件，使用java -jar运行
-        if self.apktool_path.endswith('.jar'):
-            cmd = [config.JAVA_PATH, "-jar", self.apktool_path, "b", input_dir, "-o", output_apk]
-        else:
-            cmd = [self.apktool_path, "b", input_dir, "-o", output_apk]
-
-        print(f"[INFO] 正在打包: {input_dir}")
-        print(f"[INFO] 输出文件: {output_apk}")
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        cache_path = os.path.join(os.path.dirname(output_apk), _BUILD_CACHE_FILE)
+        # 快速打包与正常打包的产物不同，缓存需要区分
+        salt = self._apktool_salt() + (':fast' if fast else '')
+        fingerprint, input_size = _tree_fingerprint(input_dir, salt)
+        if use_cache and not force:
+            # 输出 APK 在打包后被改写过（如原地签名、对齐）时不能当作新产物复用
+            entry = _load_build_cache(cache_path).get(output_apk)
+            output_sig = _output_signature(output_apk)
+            if output_sig and isinstance(entry, dict) and entry.get('fingerprint') == fingerprint \
+                    and entry.get('output') == output_sig:
+                log.info("输入未变化，跳过打包: %s", output_apk)
+                return output_apk
+
+        self.require_tools('apktool')
+        if self._apktool_is_jar:
+            _ensure_cds_dir()
+        cmd = (*self._build_prefix, *self._heap_opts(input_size), *self._build_suffix,
+               *(("--no-crunch",) if fast else ()), input_dir, "-o", output_apk)
+        if cpus:
+            cmd = ("taskset", "-c", ",".join(map(str, cpus)), *cmd)
+
+        log.info("正在打包: %s", input_dir)
+        log.info("输出文件: %s", output_apk)
+
+        result = await _run_async(cmd, fail_fast=True)
 
         if result.returncode != 0:
             raise ApkRepkgError(f"打包失败: {result.stderr}")
 
-        print("[INFO] 打包成功")
+        if use_cache:
+            cache = _load_build_cache(cache_path)
+            cache[output_apk] = {'fingerprint': fingerprint, 'output': _output_signature(output_apk)}
+            _save_build_cache(cache_path, cache)
+
+        log.info("打包成功: %s", output_apk)
         return output_apk
 
-    def zip_build(self, input_dir: str, output_apk: str, align: bool = True) -> str:
+    def zip_build(self, input_dir: str, output_apk: str, align: bool = True, fast: bool = False) -> str:
         """
         通过ZIP方式重新打包APK（不使用apktool）
 
@@ -84,6 +1032,7 @@ class ApkRepkg:
             input_dir: 解压后的APK目录路径
             output_apk: 输出APK路径
             align: 是否进行zipalign对齐优化（默认True）
+            fast: 快速打包（开发调试用），使用最低压缩级别 1，体积略大但压缩快数倍
 
         Returns:
             打包后的APK文件路径
@@ -102,128 +1051,103 @@ class ApkRepkg:
         if os.path.exists(output_apk):
             os.remove(output_apk)
 
-        # 尝试使用 7z 压缩（更高效）
-        seven_zip = getattr(config, 'SEVEN_ZIP_PATH', '7z')
-        try:
-            return self._zip_build_with_7z(input_dir, output_apk, seven_zip, align)
-        except FileNotFoundError:
-            print(f"[INFO] 7z 不可用，使用 Python zipfile...")
-            return self._zip_build_with_python(input_dir, output_apk, align)
-
-    def _zip_build_with_7z(self, input_dir: str, output_apk: str, seven_zip: str, align: bool) -> str:
-        """使用 7z 压缩（更高效，体积更小）"""
-        print(f"[INFO] 正在打包 (7z方式): {input_dir}")
-
-        # 需要不压缩的文件扩展名
-        store_extensions = {
-            '.dex', '.so', '.png', '.jpg', '.jpeg', '.gif', '.webp',
-            '.mp3', '.mp4', '.ogg', '.arsc'
-        }
-
-        # 构建文件列表
-        files_to_add = []
-        for root, dirs, files in os.walk(input_dir):
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d != '__MACOSX']
-            if 'META-INF' in dirs:
-                dirs.remove('META-INF')
-
-            for file in files:
-                if file.startswith('.'):
-                    continue
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, input_dir).replace('\\', '/')
-                files_to_add.append((file_path, arcname))
-
-        # 使用 7z 命令压缩
-        temp_list_file = os.path.join(input_dir, '_7z_file_list.txt')
-        try:
-            with open(temp_list_file, 'w', encoding='utf-8') as f:
-                for file_path, arcname in files_to_add:
-                    ext = os.path.splitext(file_path)[1].lower()
-                    # 不压缩的文件用 -mx0
-                    if ext in store_extensions or os.path.basename(file_path) in ('resources.arsc', 'AndroidManifest.xml'):
-                        f.write(f'{file_path}\n')
-                    else:
-                        f.write(f'{file_path}\n')
-
-            # 7z 命令：创建 ZIP，使用 DEFLATE，最高压缩
-            cmd = [
-                seven_zip, 'a', '-tzip',
-                f'-mx={config.ZIP_COMPRESS_LEVEL}',
-                '-mfb=256',
-                '-mpass=15',
-                '-r',
-                output_apk,
-                f'{input_dir}\\*'
-            ]
-
-            # 排除 META-INF 和隐藏文件
-            exclude_args = [
-                '-x!META-INF\\*',
-                '-x!.*',
-                '-x!__MACOSX\\*',
-                '-x!_7z_file_list.txt'
-            ]
-            cmd.extend(exclude_args)
-
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=input_dir)
-            if result.returncode != 0:
-                raise ApkRepkgError(f"7z 压缩失败: {result.stderr}")
+        return self._packer(input_dir, output_apk, align, fast)
 
-        finally:
-            if os.path.exists(temp_list_file):
-                os.remove(temp_list_file)
+    @functools.cached_property
+    def _packer(self) -> Callable[[str, str, bool, bool], str]:
+        """
+        ZIP 打包实现，首次使用时选择一次：7z 可用时使用 7z（更高效），否则使用 Python zipfile
 
-        print("[INFO] 7z 打包成功")
+        Returns:
+            (input_dir, output_apk, align, fast) -> output_apk
+        """
+        seven_zip = shutil.which(get_config().seven_zip_path) or shutil.which('7z')
+        if seven_zip:
+            return functools.partial(self._zip_build_with_7z, seven_zip=seven_zip)
+        log.warning("7z 不可用，使用 Python zipfile...")
+        return self._zip_build_with_python
+
+    def _zip_build_with_7z(self, input_dir: str, output_apk: str, align: bool, fast: bool,
+                           seven_zip: str) -> str:
+        """使用 7z 压缩（更高效，体积更小）"""
+        log.info("正在打包 (7z方式): %s", input_dir)
+
+        # 文件列表由 Python 遍历生成（已排除 META-INF 和隐藏文件），通过列表文件传给 7z，
+        # 7z 不再自行递归遍历目录；路径相对于 input_dir，即 ZIP 内的条目名。
+        # 7z 一次调用只能使用一种压缩级别，按级别分组，每组调用一次追加到同一个 ZIP，
+        # STORE 的条目（级别 0）最后以 -mx=0 追加
+        by_level: Dict[int, List[str]] = collections.defaultdict(list)
+        for _, arcname, level in _iter_apk_entries(input_dir, fast):
+            by_level[level].append(arcname.replace('/', os.sep))
+
+        for level in sorted(by_level, key=lambda lv: lv == 0):
+            if level:
+                # DEFLATE 参数：低压缩级别时不做多轮优化
+                method_opts = ['-mm=Deflate', f'-mx={level}']
+                if level >= 7:
+                    method_opts.extend(['-mfb=256', '-mpass=15'])
+            else:
+                method_opts = ['-mx=0']
+            names = by_level[level]
+            fd, list_file = tempfile.mkstemp(prefix='apkrepkg_7z_', suffix='.txt')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    for name in names:
+                        f.write(name)
+                        f.write('\n')
+
+                cmd = [seven_zip, 'a', '-tzip', *method_opts, '-scsUTF-8', output_apk, f'@{list_file}']
+                result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=input_dir)
+                if result.returncode != 0:
+                    raise ApkRepkgError(f"7z 压缩失败: {_decode_output(result.stderr)}")
+            finally:
+                os.remove(list_file)
+
+        log.info("7z 打包成功")
 
         if align:
             self._zipalign(output_apk)
 
         return output_apk
 
-    def _zip_build_with_python(self, input_dir: str, output_apk: str, align: bool) -> str:
+    def _zip_build_with_python(self, input_dir: str, output_apk: str, align: bool, fast: bool) -> str:
         """使用 Python zipfile 压缩（回退方案）"""
-        print(f"[INFO] 正在打包 (ZIP方式): {input_dir}")
-        print(f"[INFO] 压缩级别: {config.ZIP_COMPRESS_LEVEL}")
-
-        # 需要以STORE方式存储的文件（不压缩）
-        store_extensions = {
-            '.dex', '.so', '.png', '.jpg', '.jpeg', '.gif', '.webp',
-            '.mp3', '.mp4', '.ogg', '.arsc'
-        }
-
-        store_filenames = {
-            'resources.arsc',
-            'AndroidManifest.xml',
-        }
-
-        with zipfile.ZipFile(output_apk, 'w', zipfile.ZIP_DEFLATED, compresslevel=config.ZIP_COMPRESS_LEVEL) as zf:
-            for root, dirs, files in os.walk(input_dir):
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d != '__MACOSX']
-                if 'META-INF' in dirs:
-                    dirs.remove('META-INF')
-
-                for file in files:
-                    if file.startswith('.'):
-                        continue
-
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, input_dir)
-
-                    ext = os.path.splitext(file)[1].lower()
-                    filename = os.path.basename(file)
-
-                    if ext in store_extensions or filename in store_filenames:
-                        compress_type = zipfile.ZIP_STORED
-                    else:
-                        compress_type = zipfile.ZIP_DEFLATED
-
-                    zf.write(file_path, arcname, compress_type=compress_type)
-
-        print("[INFO] ZIP打包成功")
-
-        if align:
-            self._zipalign(output_apk)
+        log.info("正在打包 (ZIP方式): %s", input_dir)
+        default_level, levels = _compress_levels(fast)
+        log.info("压缩级别: %s（按扩展名: %s）", default_level, levels or '无')
+
+        # 第一步：收集文件列表（顺序即 ZIP 中的条目顺序）
+        entries = []
+        total_size = 0
+        for file_path, arcname, level in _iter_apk_entries(input_dir, fast):
+            compress_type = zipfile.ZIP_DEFLATED if level else zipfile.ZIP_STORED
+            st = os.stat(file_path)
+            total_size += st.st_size
+            entries.append((file_path, arcname, compress_type, level, st))
+
+        # 第二步：多线程读取并压缩（zlib 压缩时释放 GIL），按提交顺序依次写入。
+        # 最多同时缓存 2 倍线程数的压缩结果，避免大目录全部压缩数据驻留内存
+        workers = os.cpu_count() or 1
+        alignment = _alignment_rule() if align else None
+        with open(output_apk, 'wb', buffering=_ZIP_WRITE_BUFFER) as out:
+            # 按输入总大小预分配（压缩后只会更小），减少文件增长时的元数据更新和碎片，
+            # 写完后截断到实际大小
+            _preallocate(out, total_size)
+            with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED, compresslevel=default_level) as zf, \
+                    ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = collections.deque()
+                for file_path, arcname, compress_type, level, st in entries:
+                    _readahead(file_path)
+                    pending.append(executor.submit(_compress_entry, file_path, arcname,
+                                                   compress_type, level, st))
+                    if len(pending) >= workers * 2:
+                        _write_compressed(zf, *pending.popleft().result(), alignment=alignment)
+                while pending:
+                    _write_compressed(zf, *pending.popleft().result(), alignment=alignment)
+            out.truncate()
+
+        # 写入时已按 zipalign 的规则对齐，不需要再调用 zipalign 重写整个文件
+        log.info("ZIP打包成功")
 
         return output_apk
 
@@ -236,13 +1160,11 @@ class ApkRepkg:
         Args:
             aar_path: AAR 文件路径
             output_dex: 输出 DEX 文件路径
-            output_dir: 临时工作目录（默认使用系统临时目录）
+            output_dir: 临时工作目录（默认使用 temp_workspace 创建的临时目录）
 
         Returns:
             转换后的 DEX 文件路径
         """
-        import tempfile
-
         aar_path = os.path.abspath(aar_path)
         output_dex = os.path.abspath(output_dex)
 
@@ -252,87 +1174,43 @@ class ApkRepkg:
         if not aar_path.lower().endswith('.aar'):
             raise ApkRepkgError(f"输入文件不是 AAR 格式: {aar_path}")
 
-        print(f"[INFO] 正在转换 AAR → DEX")
-        print(f"[INFO] 输入 AAR: {aar_path}")
-        print(f"[INFO] 输出 DEX: {output_dex}")
+        log.info("正在转换 AAR → DEX")
+        log.info("输入 AAR: %s", aar_path)
+        log.info("输出 DEX: %s", output_dex)
 
-        # 创建临时工作目录
-        temp_dir = output_dir or tempfile.mkdtemp(prefix="aar_to_dex_")
-        os.makedirs(temp_dir, exist_ok=True)
+        # 创建临时工作目录（未指定时使用 temp_workspace，退出时自动删除）
+        with contextlib.ExitStack() as stack:
+            temp_dir = output_dir or stack.enter_context(temp_workspace())
+            os.makedirs(temp_dir, exist_ok=True)
 
-        try:
             # 1. 解压 AAR，提取 classes.jar
-            print("[INFO] 步骤 1/3: 解压 AAR 提取 classes.jar")
-            with zipfile.ZipFile(aar_path, 'r') as zf:
-                if 'classes.jar' not in zf.namelist():
-                    raise ApkRepkgError(f"AAR 文件中没有 classes.jar: {aar_path}")
-                zf.extract('classes.jar', path=temp_dir)
-
+            log.info("步骤 1/3: 解压 AAR 提取 classes.jar")
+            # d8 以随机访问方式读取输入且要求 .jar/.zip 扩展名，无法从管道读取，
+            # 因此仍需落盘；直接按条目名查找并以大块流式写出，不构建完整文件名列表
             jar_path = os.path.join(temp_dir, 'classes.jar')
+            with zipfile.ZipFile(aar_path, 'r') as zf:
+                try:
+                    info = zf.getinfo('classes.jar')
+                except KeyError:
+                    raise ApkRepkgError(f"AAR 文件中没有 classes.jar: {aar_path}") from None
+                with zf.open(info) as src, open(jar_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
 
             # 2. 使用 d8 将 JAR 转为 DEX
-            print("[INFO] 步骤 2/3: 使用 d8 将 JAR 转换为 DEX")
-
-            d8_cmd = [
-                'java', '-jar', self.apksigner_path.replace('apksigner.bat', '').replace('apksigner', '') + '../build-tools/34.0.0/lib/d8.jar'
-                if os.name == 'nt' and not os.path.isfile(getattr(config, 'D8_PATH', 'd8'))
-                else getattr(config, 'D8_PATH', 'd8'),
-            ]
-
-            # 如果是 .bat 文件，直接调用；否则需要 java -jar
-            d8_path = getattr(config, 'D8_PATH', 'd8')
-            if d8_path.endswith('.bat') or d8_path.endswith('.exe'):
-                d8_cmd = [d8_path]
-            else:
-                d8_cmd = ['java', '-jar', d8_path]
-
-            # 添加 android.jar 作为 boot classpath
-            android_jar = getattr(config, 'ANDROID_JAR_PATH', None)
-            if android_jar and os.path.isfile(android_jar):
-                d8_cmd.extend(['--lib', android_jar])
-
-            d8_cmd.extend([
-                '--output', temp_dir,
-                jar_path
-            ])
-
-            print(f"[INFO] d8 命令: {' '.join(d8_cmd)}")
-            result = subprocess.run(d8_cmd, capture_output=True, text=True)
-
-            if result.returncode != 0:
-                raise ApkRepkgError(f"d8 转换失败: {result.stderr}")
+            log.info("步骤 2/3: 使用 d8 将 JAR 转换为 DEX")
+            dex_source = self.jars_to_dex([jar_path], temp_dir)[0]
 
             # 3. 移动 DEX 文件到目标位置
-            print("[INFO] 步骤 3/3: 移动 DEX 文件")
-            dex_source = os.path.join(temp_dir, 'classes.dex')
-
-            if not os.path.isfile(dex_source):
-                # d8 可能生成 classes-1.dex, classes-2.dex 等（多 DEX）
-                dex_files = [f for f in os.listdir(temp_dir) if f.endswith('.dex')]
-                if not dex_files:
-                    raise ApkRepkgError(f"d8 未生成 DEX 文件，输出目录: {temp_dir}")
-                dex_source = os.path.join(temp_dir, dex_files[0])
+            log.info("步骤 3/3: 移动 DEX 文件")
 
             # 如果目标目录不存在，创建它
             os.makedirs(os.path.dirname(output_dex), exist_ok=True)
 
-            # 删除已存在的目标文件
-            if os.path.exists(output_dex):
-                os.remove(output_dex)
-
-            shutil.move(dex_source, output_dex)
+            _replace_file(dex_source, output_dex)
 
-            print("[INFO] AAR → DEX 转换成功")
+            log.info("AAR → DEX 转换成功")
             return output_dex
 
-        finally:
-            # 清理临时文件（仅当使用系统临时目录时）
-            if output_dir is None:
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    print(f"[INFO] 清理临时目录失败: {e}")
-
     def jar_to_dex(self, jar_path: str, output_dex: str, output_dir: str = None) -> str:
         """
         将 JAR 文件转换为 DEX 文件
@@ -340,13 +1218,11 @@ class ApkRepkg:
         Args:
             jar_path: JAR 文件路径
             output_dex: 输出 DEX 文件路径
-            output_dir: 临时工作目录（默认使用系统临时目录）
+            output_dir: 临时工作目录（默认使用 temp_workspace 创建的临时目录）
 
         Returns:
             转换后的 DEX 文件路径
         """
-        import tempfile
-
         jar_path = os.path.abspath(jar_path)
         output_dex = os.path.abspath(output_dex)
 
@@ -356,66 +1232,72 @@ class ApkRepkg:
         if not jar_path.lower().endswith('.jar'):
             raise ApkRepkgError(f"输入文件不是 JAR 格式: {jar_path}")
 
-        print(f"[INFO] 正在转换 JAR → DEX")
-        print(f"[INFO] 输入 JAR: {jar_path}")
-        print(f"[INFO] 输出 DEX: {output_dex}")
+        log.info("正在转换 JAR → DEX")
+        log.info("输入 JAR: %s", jar_path)
+        log.info("输出 DEX: %s", output_dex)
 
-        # 创建临时工作目录
-        temp_dir = output_dir or tempfile.mkdtemp(prefix="jar_to_dex_")
-        os.makedirs(temp_dir, exist_ok=True)
+        # 创建临时工作目录（未指定时使用 temp_workspace，退出时自动删除）
+        with contextlib.ExitStack() as stack:
+            temp_dir = output_dir or stack.enter_context(temp_workspace())
+            os.makedirs(temp_dir, exist_ok=True)
 
-        try:
             # 使用 d8 将 JAR 转为 DEX
-            print("[INFO] 使用 d8 将 JAR 转换为 DEX")
+            log.info("使用 d8 将 JAR 转换为 DEX")
+            dex_source = self.jars_to_dex([jar_path], temp_dir)[0]
 
-            d8_path = getattr(config, 'D8_PATH', 'd8')
-            if d8_path.endswith('.bat') or d8_path.endswith('.exe'):
-                d8_cmd = [d8_path]
-            else:
-                d8_cmd = ['java', '-jar', d8_path]
+            # 移动 DEX 文件到目标位置
 
-            # 添加 android.jar 作为 boot classpath
-            android_jar = getattr(config, 'ANDROID_JAR_PATH', None)
-            if android_jar and os.path.isfile(android_jar):
-                d8_cmd.extend(['--lib', android_jar])
+            os.makedirs(os.path.dirname(output_dex), exist_ok=True)
 
-            d8_cmd.extend([
-                '--output', temp_dir,
-                jar_path
-            ])
+            _replace_file(dex_source, output_dex)
 
-            print(f"[INFO] d8 命令: {' '.join(d8_cmd)}")
-            result = subprocess.run(d8_cmd, capture_output=True, text=True)
+            log.info("JAR → DEX 转换成功")
+            return output_dex
 
-            if result.returncode != 0:
-                raise ApkRepkgError(f"d8 转换失败: {result.stderr}")
+    def jars_to_dex(self, jar_paths: Sequence[str], output_dir: str) -> List[str]:
+        """
+        用一次 d8 调用将多个 JAR 文件转换为 DEX
 
-            # 移动 DEX 文件到目标位置
-            dex_source = os.path.join(temp_dir, 'classes.dex')
+        多个库只启动一次 JVM，d8 也能跨输入合并和去重。
+        输出超过单个 DEX 方法数上限时 d8 会生成 classes2.dex 等多个文件。
 
-            if not os.path.isfile(dex_source):
-                # 检查多 DEX 文件
-                dex_files = [f for f in os.listdir(temp_dir) if f.endswith('.dex')]
-                if not dex_files:
-                    raise ApkRepkgError(f"d8 未生成 DEX 文件，输出目录: {temp_dir}")
-                dex_source = os.path.join(temp_dir, dex_files[0])
+        Args:
+            jar_paths: JAR 文件路径列表
+            output_dir: DEX 输出目录
 
-            os.makedirs(os.path.dirname(output_dex), exist_ok=True)
+        Returns:
+            生成的 DEX 文件路径列表，classes.dex 在最前
+        """
+        if not jar_paths:
+            raise ApkRepkgError("没有需要转换的 JAR 文件")
 
-            if os.path.exists(output_dex):
-                os.remove(output_dex)
+        jar_paths = [os.path.abspath(p) for p in jar_paths]
+        output_dir = os.path.abspath(output_dir)
+        for jar_path in jar_paths:
+            if not os.path.isfile(jar_path):
+                raise ApkRepkgError(f"JAR 文件不存在: {jar_path}")
+        self.require_tools('d8')
+        os.makedirs(output_dir, exist_ok=True)
 
-            shutil.move(dex_source, output_dex)
+        d8_cmd = [*_resolve_d8(), '--output', output_dir, *jar_paths]
 
-            print("[INFO] JAR → DEX 转换成功")
-            return output_dex
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("d8 命令: %s", ' '.join(d8_cmd))
+        result = subprocess.run(d8_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
-        finally:
-            if output_dir is None:
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    print(f"[INFO] 清理临时目录失败: {e}")
+        if result.returncode != 0:
+            raise ApkRepkgError(f"d8 转换失败: {_decode_output(result.stderr)}")
+
+        # d8 输出 classes.dex, classes2.dex, ...（多 DEX），按序号排序
+        dex_index = {}
+        for name in os.listdir(output_dir):
+            if name.startswith('classes') and name.endswith('.dex'):
+                number = name[len('classes'):-len('.dex')]
+                if not number or number.isdigit():
+                    dex_index[name] = int(number or 1)
+        if not dex_index:
+            raise ApkRepkgError(f"d8 未生成 DEX 文件，输出目录: {output_dir}")
+        return [os.path.join(output_dir, name) for name in sorted(dex_index, key=dex_index.get)]
 
     def dex_to_smali(self, dex_path: str, output_dir: str) -> str:
         """
@@ -440,13 +1322,12 @@ class ApkRepkg:
             raise ApkRepkgError(f"输入文件不是 DEX 格式: {dex_path}")
 
         # 检查 baksmali 路径
-        baksmali_path = getattr(config, 'BAKSMALI_PATH', './tools/baksmali.jar')
-        if not os.path.isfile(baksmali_path):
-            raise ApkRepkgError(f"baksmali 工具不存在: {baksmali_path}")
+        baksmali_path = get_config().baksmali_path
+        self.require_tools('baksmali')
 
-        print(f"[INFO] 正在反编译 DEX → Smali")
-        print(f"[INFO] 输入 DEX: {dex_path}")
-        print(f"[INFO] 输出目录: {output_dir}")
+        log.info("正在反编译 DEX → Smali")
+        log.info("输入 DEX: %s", dex_path)
+        log.info("输出目录: %s", output_dir)
 
         # 如果输出目录已存在，清空它
         if os.path.exists(output_dir):
@@ -454,19 +1335,21 @@ class ApkRepkg:
         os.makedirs(output_dir, exist_ok=True)
 
         # 构建 baksmali 命令: java -jar baksmali.jar -o [输出文件夹] dex文件
+        _ensure_cds_dir()
         baksmali_cmd = [
-            'java', '-jar', baksmali_path,
+            *_java_cmd(baksmali_path),
             '-o', output_dir,
             dex_path
         ]
 
-        print(f"[INFO] baksmali 命令: {' '.join(baksmali_cmd)}")
-        result = subprocess.run(baksmali_cmd, capture_output=True, text=True)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("baksmali 命令: %s", ' '.join(baksmali_cmd))
+        result = subprocess.run(baksmali_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
         if result.returncode != 0:
-            raise ApkRepkgError(f"baksmali 反编译失败: {result.stderr}")
+            raise ApkRepkgError(f"baksmali 反编译失败: {_decode_output(result.stderr)}")
 
-        print("[INFO] DEX → Smali 反编译成功")
+        log.info("DEX → Smali 反编译成功")
         return output_dir
 
     def smali_to_dex(self, smali_dir: str, output_dex: str) -> str:
@@ -489,13 +1372,12 @@ class ApkRepkg:
             raise ApkRepkgError(f"Smali 目录不存在: {smali_dir}")
 
         # 检查 smali 路径
-        smali_tool_path = getattr(config, 'SMALI_PATH', './tools/smali.jar')
-        if not os.path.isfile(smali_tool_path):
-            raise ApkRepkgError(f"smali 工具不存在: {smali_tool_path}")
+        smali_tool_path = get_config().smali_path
+        self.require_tools('smali')
 
-        print(f"[INFO] 正在编译 Smali → DEX")
-        print(f"[INFO] 输入目录: {smali_dir}")
-        print(f"[INFO] 输出 DEX: {output_dex}")
+        log.info("正在编译 Smali → DEX")
+        log.info("输入目录: %s", smali_dir)
+        log.info("输出 DEX: %s", output_dex)
 
         # 如果目标目录不存在，创建它
         os.makedirs(os.path.dirname(output_dex), exist_ok=True)
@@ -505,22 +1387,24 @@ class ApkRepkg:
             os.remove(output_dex)
 
         # 构建 smali 命令: java -jar smali.jar -o 目标dex文件 [smali文件夹]
+        _ensure_cds_dir()
         smali_cmd = [
-            'java', '-jar', smali_tool_path,
+            *_java_cmd(smali_tool_path),
             '-o', output_dex,
             smali_dir
         ]
 
-        print(f"[INFO] smali 命令: {' '.join(smali_cmd)}")
-        result = subprocess.run(smali_cmd, capture_output=True, text=True)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("smali 命令: %s", ' '.join(smali_cmd))
+        result = subprocess.run(smali_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
         if result.returncode != 0:
-            raise ApkRepkgError(f"smali 编译失败: {result.stderr}")
+            raise ApkRepkgError(f"smali 编译失败: {_decode_output(result.stderr)}")
 
         if not os.path.isfile(output_dex):
             raise ApkRepkgError(f"smali 未生成 DEX 文件: {output_dex}")
 
-        print("[INFO] Smali → DEX 编译成功")
+        log.info("Smali → DEX 编译成功")
         return output_dex
 
     def _zipalign(self, apk_path: str) -> None:
@@ -530,31 +1414,42 @@ class ApkRepkg:
         Args:
             apk_path: APK文件路径（原地修改）
         """
-        if not os.path.isfile(self.zipalign_path):
-            print(f"[INFO] zipalign 不可用，跳过对齐优化: {self.zipalign_path}")
+        asyncio.run(self._zipalign_async(apk_path))
+
+    @functools.cached_property
+    def _zipalign_prefix(self) -> Tuple[str, ...]:
+        """zipalign 命令前缀（-p: 未压缩的 .so 按内存页对齐，便于系统直接 mmap 加载）"""
+        cfg = get_config()
+        page_opts = ("-p",) if cfg.zipalign_page_align_so else ()
+        return (self.zipalign_path, *page_opts, "-f", str(cfg.zipalign_bytes))
+
+    async def _zipalign_async(self, apk_path: str) -> None:
+        """_zipalign 的异步实现"""
+        if 'zipalign' not in self.tools_available:
+            log.warning("zipalign 不可用，跳过对齐优化: %s", self.zipalign_path)
             return
 
-        print(f"[INFO] 正在进行zipalign对齐优化...")
+        log.info("正在进行zipalign对齐优化...")
 
         # 创建临时文件
         temp_apk = apk_path + ".aligned"
 
         try:
-            cmd = [self.zipalign_path, "-f", "4", apk_path, temp_apk]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            cmd = [*self._zipalign_prefix, apk_path, temp_apk]
+            result = await _run_async(cmd)
 
             if result.returncode != 0:
-                print(f"[INFO] zipalign 失败，跳过: {result.stderr}")
+                log.warning("zipalign 失败，跳过: %s", result.stderr)
                 return
 
             # 替换原文件
-            shutil.move(temp_apk, apk_path)
-            print("[INFO] zipalign 对齐完成")
+            _replace_file(temp_apk, apk_path)
+            log.info("zipalign 对齐完成")
 
         except FileNotFoundError:
-            print(f"[INFO] zipalign 不可用，跳过对齐优化")
+            log.warning("zipalign 不可用，跳过对齐优化")
         except Exception as e:
-            print(f"[INFO] zipalign 处理失败: {e}")
+            log.warning("zipalign 处理失败: %s", e)
             if os.path.exists(temp_apk):
                 os.remove(temp_apk)
 
@@ -576,6 +1471,13 @@ class ApkRepkg:
         Returns:
             签名后的APK文件路径
         """
+        return asyncio.run(self._sign_async(apk_path, keystore_path, storepass, alias,
+                                            keypass, v1_only, v2_only))
+
+    async def _sign_async(self, apk_path: str, keystore_path: str,
+                          storepass: str, alias: str, keypass: Optional[str] = None,
+                          v1_only: bool = False, v2_only: bool = False) -> str:
+        """sign 的异步实现"""
         apk_path = os.path.abspath(apk_path)
         keystore_path = os.path.abspath(keystore_path)
 
@@ -586,75 +1488,149 @@ class ApkRepkg:
 
         keypass = keypass or storepass
 
-        print(f"[INFO] 正在签名: {apk_path}")
+        log.info("正在签名: %s", apk_path)
 
         # 确定签名方式（优先使用参数，否则使用config配置）
-        sign_mode = getattr(config, 'SIGN_MODE', 'V1_V2')
-
         if v1_only:
-            v1_enabled, v2_enabled = "true", "false"
-            print("[INFO] 使用 V1 签名 (JAR签名)")
+            sign_mode, source = SignMode.V1_ONLY, ""
         elif v2_only:
-            v1_enabled, v2_enabled = "false", "true"
-            print("[INFO] 使用 V2 签名 (APK签名，体积更小)")
-        elif sign_mode == "V1_ONLY":
-            v1_enabled, v2_enabled = "true", "false"
-            print("[INFO] 使用 V1 签名 (JAR签名) [配置]")
-        elif sign_mode == "V2_ONLY":
-            v1_enabled, v2_enabled = "false", "true"
-            print("[INFO] 使用 V2 签名 (APK签名，体积更小) [配置]")
-        else:  # V1_V2
-            v1_enabled, v2_enabled = "true", "true"
-            print("[INFO] 使用 V1+V2 签名 [配置]")
+            sign_mode, source = SignMode.V2_ONLY, ""
+        else:
+            sign_mode, source = get_config().sign_mode, " [配置]"
+        log.info("使用 %s%s", _SIGN_MODE_DESC[sign_mode], source)
+
+        if get_config().sign_backend == 'python':
+            # 进程内签名为纯计算，放到线程池执行以免阻塞批量任务的事件循环
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._sign_in_process, apk_path, keystore_path,
+                                       storepass, alias, keypass, sign_mode is not SignMode.V2_ONLY, sign_mode is not SignMode.V1_ONLY)
+            log.info("签名成功 (进程内): %s", apk_path)
+            return apk_path
 
         # 尝试使用 apksigner（优先），否则使用 jarsigner
+        # 两者的密码都通过环境变量传递，避免出现在进程命令行中（ps 可见）
+        env = dict(os.environ, APKREPKG_STOREPASS=storepass, APKREPKG_KEYPASS=keypass)
+        # apksigner 配置为 jar 时同样通过 _java_cmd 启动，复用 AppCDS 归档
+        if self.apksigner_path.endswith('.jar'):
+            _ensure_cds_dir()
+            apksigner_prefix = _java_cmd(self.apksigner_path)
+        else:
+            apksigner_prefix = [self.apksigner_path]
         apksigner_cmd = [
-            self.apksigner_path,
+            *apksigner_prefix,
             "sign",
             "--ks", keystore_path,
-            "--ks-pass", f"pass:{storepass}",
+            "--ks-pass", "env:APKREPKG_STOREPASS",
             "--ks-key-alias", alias,
-            "--key-pass", f"pass:{keypass}",
-            "--v1-signing-enabled", v1_enabled,
-            "--v2-signing-enabled", v2_enabled,
+            "--key-pass", "env:APKREPKG_KEYPASS",
+            *SIGN_ARGS[sign_mode],
             apk_path
         ]
 
         try:
-            result = subprocess.run(apksigner_cmd, capture_output=True, text=True)
+            result = await _run_async(apksigner_cmd, env=env)
             if result.returncode != 0:
                 raise ApkRepkgError(f"apksigner 签名失败: {result.stderr}")
         except FileNotFoundError:
             # apksigner 不可用，回退到 jarsigner
-            print("[INFO] apksigner 不可用，使用 jarsigner...")
+            log.warning("apksigner 不可用，使用 jarsigner...")
             sign_cmd = [
                 "jarsigner",
-                "-verbose",
                 "-sigalg", "SHA256withRSA",
                 "-digestalg", "SHA256",
                 "-keystore", keystore_path,
-                "-storepass", storepass,
-                "-keypass", keypass,
+                "-storepass:env", "APKREPKG_STOREPASS",
+                "-keypass:env", "APKREPKG_KEYPASS",
                 apk_path,
                 alias
             ]
-            result = subprocess.run(sign_cmd, capture_output=True, text=True)
+            result = await _run_async(sign_cmd, env=env, merge_stdout=True)
 
         if result.returncode != 0:
             raise ApkRepkgError(f"签名失败: {result.stderr}")
 
-        # 打印签名输出以便调试
-        if result.stdout:
-            print(result.stdout[:500])  # 只打印前500字符
+        log.info("签名成功: %s", apk_path)
+        return apk_path
+
+    def _sign_in_process(self, apk_path: str, keystore_path: str, storepass: str, alias: str,
+                         keypass: str, v1_enabled: bool, v2_enabled: bool) -> None:
+        """使用 apk_signer 在进程内签名，同一密钥库只加载一次"""
+        cache_key = (keystore_path, alias)
+        try:
+            signing_key = self._signing_keys.get(cache_key)
+            if signing_key is None:
+                signing_key = apk_signer.load_signing_key(keystore_path, storepass, alias, keypass)
+                self._signing_keys[cache_key] = signing_key
+            apk_signer.sign_apk(apk_path, signing_key, alias, v1_enabled, v2_enabled, *_alignment_rule())
+        except apk_signer.ApkSignError as e:
+            raise ApkRepkgError(f"签名失败: {e}")
+
+    def sign_batch(self, apk_paths: Sequence[str], keystore_path: str,
+                   storepass: str, alias: str, keypass: Optional[str] = None,
+                   max_workers: int = None) -> List[str]:
+        """
+        批量签名多个APK
+
+        apksigner 每次调用只能签名一个APK，这里并发启动多个签名进程，
+        并发数默认为 min(APK数, CPU核数)。
 
-        print("[INFO] 签名成功")
+        Args:
+            apk_paths: 未签名的APK文件路径列表
+            keystore_path: 密钥库文件路径
+            storepass: 密钥库密码
+            alias: 密钥别名
+            keypass: 密钥密码（默认与storepass相同）
+            max_workers: 最大并发数
+
+        Returns:
+            与 apk_paths 顺序一致的签名后APK文件路径列表
+        """
+        return asyncio.run(self._sign_batch_async(apk_paths, keystore_path, storepass, alias,
+                                                  keypass, max_workers))
+
+    async def _sign_batch_async(self, apk_paths: Sequence[str], keystore_path: str,
+                                storepass: str, alias: str, keypass: Optional[str] = None,
+                                max_workers: int = None) -> List[str]:
+        """sign_batch 的异步实现"""
+        if not apk_paths:
+            return []
+
+        sem = asyncio.Semaphore(max_workers or min(len(apk_paths), os.cpu_count() or 1))
+
+        async def _bounded(apk_path: str) -> str:
+            async with sem:
+                return await self._sign_async(apk_path, keystore_path, storepass, alias, keypass)
+
+        return await _gather_all([_bounded(apk_path) for apk_path in apk_paths])
+
+    async def _align_step(self, apk_path: str, *signing) -> str:
+        """流水线步骤：zipalign（签名参数不使用）"""
+        await self._zipalign_async(apk_path)
+        return apk_path
+
+    @functools.cached_property
+    def _repack_pipeline(self) -> Tuple[Callable[..., Awaitable[str]], ...]:
+        """
+        打包之后依次执行的步骤，按 ZIPALIGN_ENABLED 确定一次
+
+        V2 签名覆盖整个文件，zipalign 必须在签名之前完成，顺序由这里固定。
+        每个步骤接收 (apk_path, keystore_path, storepass, alias)，返回处理后的APK路径。
+        """
+        if get_config().zipalign_enabled:
+            return (self._align_step, self._sign_async)
+        return (self._sign_async,)
+
+    async def _run_pipeline(self, apk_path: str, keystore_path: str, storepass: str, alias: str) -> str:
+        """对打包产物依次执行 _repack_pipeline 中的步骤"""
+        for step in self._repack_pipeline:
+            apk_path = await step(apk_path, keystore_path, storepass, alias)
         return apk_path
 
     def repack(self, input_dir: str, output_apk: str,
                keystore_path: str = None, storepass: str = None,
                alias: str = None) -> str:
         """
-        完整重打包流程：打包 -> 签名
+        完整重打包流程：打包 -> zipalign -> 签名
 
         Args:
             input_dir: 反编译后的目录路径
@@ -667,31 +1643,120 @@ class ApkRepkg:
             重打包并签名后的APK文件路径
         """
         # 使用配置文件默认值
-        keystore_path = keystore_path or config.DEFAULT_KEYSTORE
-        storepass = storepass or config.DEFAULT_STOREPASS
-        alias = alias or config.DEFAULT_ALIAS
+        keystore_path = keystore_path or get_config().default_keystore
+        storepass = storepass or get_config().default_storepass
+        alias = alias or get_config().default_alias
 
-        print("=" * 50)
-        print("APK 重打包工具")
-        print("=" * 50)
+        # 打包、对齐、签名的中间文件放在内存文件系统中，完成后再移动到输出路径
+        work_apk = _intermediate_apk(output_apk)
+        try:
+            # 1. 打包
+            log.info("[步骤 1/2] 打包 APK")
+            if work_apk == output_apk:
+                built_apk = self.build(input_dir, output_apk)
+            else:
+                built_apk = asyncio.run(self._build_async(input_dir, work_apk, use_cache=False))
 
-        # 1. 打包
-        print("\n[步骤 1/2] 打包 APK")
-        print("-" * 50)
-        built_apk = self.build(input_dir, output_apk)
+            # 2. 对齐、签名
+            log.info("[步骤 2/2] 签名 APK")
+            signed_apk = asyncio.run(self._run_pipeline(built_apk, keystore_path, storepass, alias))
+            final_apk = _finish_intermediate(signed_apk, output_apk)
+        finally:
+            _discard_intermediate(work_apk, output_apk)
 
-        # 2. 签名
-        print("\n[步骤 2/2] 签名 APK")
-        print("-" * 50)
-        final_apk = self.sign(built_apk, keystore_path, storepass, alias)
-
-        print("\n" + "=" * 50)
-        print("重打包完成！")
-        print(f"输出文件: {final_apk}")
-        print("=" * 50)
+        log.info("重打包完成: %s", final_apk)
 
         return final_apk
 
+    async def repack_many(self, jobs: Sequence[Tuple[str, str]],
+                          keystore_path: str = None, storepass: str = None,
+                          alias: str = None, max_workers: int = None) -> List[str]:
+        """
+        批量重打包：并发执行多个 打包 -> 签名 流程（如多渠道打包）
+
+        每个任务独立运行 apktool 与 apksigner 子进程，并发数受信号量限制，
+        默认为 min(任务数, CPU核数)。
+
+        Args:
+            jobs: (反编译目录, 输出APK路径) 列表
+            keystore_path: 密钥库文件路径，默认使用config.py配置
+            storepass: 密钥库密码，默认使用config.py配置
+            alias: 密钥别名，默认使用config.py配置
+            max_workers: 最大并发数
+
+        Returns:
+            与 jobs 顺序一致的签名后APK文件路径列表
+        """
+        if not jobs:
+            return []
+        # 启动任何任务之前检查，避免部分任务已开始后才失败
+        self.require_tools('apktool')
+
+        keystore_path = keystore_path or get_config().default_keystore
+        storepass = storepass or get_config().default_storepass
+        alias = alias or get_config().default_alias
+
+        workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+        log.info("批量重打包: %s 个任务，并发数 %s", len(jobs), workers)
+
+        # 每个并发槽位对应一组互不重叠的 CPU 核，apktool 进程绑定到所在槽位的核上，
+        # 减少多个 JVM 之间的缓存争用和跨 NUMA 节点迁移；槽位队列同时起到信号量的作用
+        slots = asyncio.Queue()
+        for cpus in _partition_cpus(workers):
+            slots.put_nowait(cpus)
+
+        async def _bounded(input_dir: str, output_apk: str) -> str:
+            cpus = await slots.get()
+            try:
+                built_apk = await self._build_async(input_dir, output_apk, cpus=cpus)
+                return await self._run_pipeline(built_apk, keystore_path, storepass, alias)
+            finally:
+                slots.put_nowait(cpus)
+
+        return await _gather_all([_bounded(i, o) for i, o in jobs])
+
+    def multi_channel(self, base_apk: str, channels: Sequence[str], output_dir: str) -> List[str]:
+        """
+        多渠道打包：基于一个已签名的APK生成各渠道APK
+
+        只需打包、签名一次，每个渠道复制一份并写入渠道号，不重新打包也不重新签名。
+        V2 签名的APK渠道号写入签名块（Walle 兼容），仅 V1 签名的写入 ZIP 注释（VasDolly 兼容）。
+
+        Args:
+            base_apk: 已签名的基础APK路径
+            channels: 渠道号列表
+            output_dir: 输出目录，文件名为 <基础APK名>_<渠道号>.apk
+
+        Returns:
+            与 channels 顺序一致的渠道APK路径列表
+        """
+        base_apk = os.path.abspath(base_apk)
+        output_dir = os.path.abspath(output_dir)
+
+        if not os.path.isfile(base_apk):
+            raise ApkRepkgError(f"APK文件不存在: {base_apk}")
+
+        os.makedirs(output_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(base_apk))[0]
+
+        log.info("多渠道打包: %s", base_apk)
+        log.info("渠道数: %s", len(channels))
+
+        def _make(channel: str) -> str:
+            channel_apk = os.path.join(output_dir, f"{name}_{channel}.apk")
+            # Linux 下 copyfile 使用 sendfile 在内核态复制
+            shutil.copyfile(base_apk, channel_apk)
+            return apk_signer.write_channel(channel_apk, channel)
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(channels), os.cpu_count() or 1) or 1) as executor:
+                outputs = list(executor.map(_make, channels))
+        except apk_signer.ApkSignError as e:
+            raise ApkRepkgError(f"写入渠道失败: {e}")
+
+        log.info("多渠道打包完成: %s", output_dir)
+        return outputs
+
     def repack_zip(self, input_dir: str, output_apk: str,
                    keystore_path: str = None, storepass: str = None,
                    alias: str = None, align: bool = None) -> str:
@@ -713,29 +1778,26 @@ class ApkRepkg:
             重打包并签名后的APK文件路径
         """
         # 使用配置文件默认值
-        keystore_path = keystore_path or config.DEFAULT_KEYSTORE
-        storepass = storepass or config.DEFAULT_STOREPASS
-        alias = alias or config.DEFAULT_ALIAS
-        align = align if align is not None else getattr(config, 'ZIPALIGN_ENABLED', True)
-
-        print("=" * 50)
-        print("APK ZIP方式重打包工具")
-        print("=" * 50)
-
-        # 1. ZIP打包
-        print("\n[步骤 1/2] ZIP打包")
-        print("-" * 50)
-        built_apk = self.zip_build(input_dir, output_apk, align=align)
+        keystore_path = keystore_path or get_config().default_keystore
+        storepass = storepass or get_config().default_storepass
+        alias = alias or get_config().default_alias
+        align = align if align is not None else get_config().zipalign_enabled
 
-        # 2. 签名（使用config.py中的SIGN_MODE配置）
-        print("\n[步骤 2/2] 签名 APK")
-        print("-" * 50)
-        final_apk = self.sign(built_apk, keystore_path, storepass, alias)
+        # 打包、签名的中间文件放在内存文件系统中，完成后再移动到输出路径
+        work_apk = _intermediate_apk(output_apk)
+        try:
+            # 1. ZIP打包
+            log.info("[步骤 1/2] ZIP打包")
+            built_apk = self.zip_build(input_dir, work_apk, align=align)
+
+            # 2. 签名（使用config.py中的SIGN_MODE配置）
+            log.info("[步骤 2/2] 签名 APK")
+            final_apk = _finish_intermediate(self.sign(built_apk, keystore_path, storepass, alias),
+                                             output_apk)
+        finally:
+            _discard_intermediate(work_apk, output_apk)
 
-        print("\n" + "=" * 50)
-        print("ZIP方式重打包完成！")
-        print(f"输出文件: {final_apk}")
-        print("=" * 50)
+        log.info("ZIP方式重打包完成: %s", final_apk)
 
         return final_apk
 
@@ -744,6 +1806,11 @@ def main():
     """命令行入口"""
     import argparse
 
+    try:
+        cfg = get_config()
+    except ConfigError as e:
+        print(f"[错误] {e}", file=sys.stderr)
+        return 1
     parser = argparse.ArgumentParser(
         description="APK自动重打包工具 - 基于apktool或ZIP方式",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -758,6 +1825,12 @@ def main():
   # apktool方式完整流程（打包+签名）
   python apk_repackager.py repack -i decoded/ -o app.apk
 
+  # apktool方式批量重打包（多个目录并发打包+签名）
+  python apk_repackager.py repack-many -i decoded_a/ decoded_b/ -d output/
+
+  # 多渠道打包（基于已签名APK写入渠道号，无需重新签名）
+  python apk_repackager.py channel -i app.apk -c huawei xiaomi -d channels/
+
   # ZIP方式完整流程（直接压缩+签名，适用于添加DEX）
   python apk_repackager.py repack-zip -i extracted/ -o app.apk
 
@@ -769,10 +1842,16 @@ def main():
 
   # JAR转DEX
   python apk_repackager.py jar-to-dex -i classes.jar -o classes.dex
+
+  # 多个JAR一次转换（只启动一次d8，-o 为输出目录）
+  python apk_repackager.py jar-to-dex -i a.jar b.jar -o dex_out/
         """
     )
 
     parser.add_argument("-v", "--version", action="version", version="%(prog)s 1.0.0")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="只输出警告和错误")
+    verbosity.add_argument("--verbose", action="store_true", help="输出调试信息（如执行的命令）")
 
     subparsers = parser.add_subparsers(dest="command", help="命令")
 
@@ -780,38 +1859,57 @@ def main():
     build_parser = subparsers.add_parser("build", help="重新打包APK")
     build_parser.add_argument("-i", "--input", required=True, help="反编译目录路径")
     build_parser.add_argument("-o", "--output", required=True, help="输出APK路径")
-    build_parser.add_argument("--apktool", default=config.APKTOOL_PATH, help=f"apktool路径 (默认: {config.APKTOOL_PATH})")
+    build_parser.add_argument("--apktool", default=cfg.apktool_path, help=f"apktool路径 (默认: {cfg.apktool_path})")
+    build_parser.add_argument("-f", "--force", action="store_true", help="忽略增量缓存，强制重新打包")
+    build_parser.add_argument("--fast", action="store_true", help="快速打包（跳过PNG优化，适用于开发调试）")
 
     # sign命令
     sign_parser = subparsers.add_parser("sign", help="签名APK")
-    sign_parser.add_argument("-i", "--input", required=True, help="输入APK路径")
-    sign_parser.add_argument("-k", "--keystore", default=config.DEFAULT_KEYSTORE, help=f"密钥库路径 (默认: {config.DEFAULT_KEYSTORE})")
-    sign_parser.add_argument("-p", "--storepass", default=config.DEFAULT_STOREPASS, help="密钥库密码")
-    sign_parser.add_argument("-a", "--alias", default=config.DEFAULT_ALIAS, help=f"密钥别名 (默认: {config.DEFAULT_ALIAS})")
+    sign_parser.add_argument("-i", "--input", required=True, nargs="+", help="输入APK路径（可多个，批量签名）")
+    sign_parser.add_argument("-k", "--keystore", default=cfg.default_keystore, help=f"密钥库路径 (默认: {cfg.default_keystore})")
+    sign_parser.add_argument("-p", "--storepass", default=cfg.default_storepass, help="密钥库密码")
+    sign_parser.add_argument("-a", "--alias", default=cfg.default_alias, help=f"密钥别名 (默认: {cfg.default_alias})")
     sign_parser.add_argument("--keypass", help="密钥密码（默认与storepass相同）")
 
     # repack命令
     repack_parser = subparsers.add_parser("repack", help="完整重打包流程（打包+签名）")
     repack_parser.add_argument("-i", "--input", required=True, help="反编译目录路径")
     repack_parser.add_argument("-o", "--output", required=True, help="输出APK路径")
-    repack_parser.add_argument("--apktool", default=config.APKTOOL_PATH, help=f"apktool路径 (默认: {config.APKTOOL_PATH})")
-    repack_parser.add_argument("-k", "--keystore", default=config.DEFAULT_KEYSTORE, help=f"密钥库路径 (默认: {config.DEFAULT_KEYSTORE})")
-    repack_parser.add_argument("-p", "--storepass", default=config.DEFAULT_STOREPASS, help="密钥库密码")
-    repack_parser.add_argument("-a", "--alias", default=config.DEFAULT_ALIAS, help=f"密钥别名 (默认: {config.DEFAULT_ALIAS})")
+    repack_parser.add_argument("--apktool", default=cfg.apktool_path, help=f"apktool路径 (默认: {cfg.apktool_path})")
+    repack_parser.add_argument("-k", "--keystore", default=cfg.default_keystore, help=f"密钥库路径 (默认: {cfg.default_keystore})")
+    repack_parser.add_argument("-p", "--storepass", default=cfg.default_storepass, help="密钥库密码")
+    repack_parser.add_argument("-a", "--alias", default=cfg.default_alias, help=f"密钥别名 (默认: {cfg.default_alias})")
+
+    # repack-many命令
+    repack_many_parser = subparsers.add_parser("repack-many", help="批量重打包（多个目录并发打包+签名）")
+    repack_many_parser.add_argument("-i", "--input", required=True, nargs="+", help="反编译目录路径（可多个）")
+    repack_many_parser.add_argument("-d", "--output-dir", required=True, help="输出目录，APK以输入目录名命名")
+    repack_many_parser.add_argument("--apktool", default=cfg.apktool_path, help=f"apktool路径 (默认: {cfg.apktool_path})")
+    repack_many_parser.add_argument("-k", "--keystore", default=cfg.default_keystore, help=f"密钥库路径 (默认: {cfg.default_keystore})")
+    repack_many_parser.add_argument("-p", "--storepass", default=cfg.default_storepass, help="密钥库密码")
+    repack_many_parser.add_argument("-a", "--alias", default=cfg.default_alias, help=f"密钥别名 (默认: {cfg.default_alias})")
+    repack_many_parser.add_argument("-j", "--jobs", type=int, help="最大并发数（默认: min(任务数, CPU核数)）")
+
+    # channel命令
+    channel_parser = subparsers.add_parser("channel", help="多渠道打包（基于已签名APK写入渠道号）")
+    channel_parser.add_argument("-i", "--input", required=True, help="已签名的APK路径")
+    channel_parser.add_argument("-c", "--channels", required=True, nargs="+", help="渠道号（可多个）")
+    channel_parser.add_argument("-d", "--output-dir", required=True, help="输出目录")
 
     # zip-build命令
     zip_build_parser = subparsers.add_parser("zip-build", help="ZIP方式打包（直接压缩，不使用apktool）")
     zip_build_parser.add_argument("-i", "--input", required=True, help="解压后的APK目录路径")
     zip_build_parser.add_argument("-o", "--output", required=True, help="输出APK路径")
     zip_build_parser.add_argument("--no-align", action="store_true", help="跳过zipalign对齐优化")
+    zip_build_parser.add_argument("--fast", action="store_true", help="快速打包（压缩级别1，适用于开发调试）")
 
     # repack-zip命令
     repack_zip_parser = subparsers.add_parser("repack-zip", help="ZIP方式完整流程（压缩+签名，适用于添加DEX文件）")
     repack_zip_parser.add_argument("-i", "--input", required=True, help="解压后的APK目录路径")
     repack_zip_parser.add_argument("-o", "--output", required=True, help="输出APK路径")
-    repack_zip_parser.add_argument("-k", "--keystore", default=config.DEFAULT_KEYSTORE, help=f"密钥库路径 (默认: {config.DEFAULT_KEYSTORE})")
-    repack_zip_parser.add_argument("-p", "--storepass", default=config.DEFAULT_STOREPASS, help="密钥库密码")
-    repack_zip_parser.add_argument("-a", "--alias", default=config.DEFAULT_ALIAS, help=f"密钥别名 (默认: {config.DEFAULT_ALIAS})")
+    repack_zip_parser.add_argument("-k", "--keystore", default=cfg.default_keystore, help=f"密钥库路径 (默认: {cfg.default_keystore})")
+    repack_zip_parser.add_argument("-p", "--storepass", default=cfg.default_storepass, help="密钥库密码")
+    repack_zip_parser.add_argument("-a", "--alias", default=cfg.default_alias, help=f"密钥别名 (默认: {cfg.default_alias})")
     repack_zip_parser.add_argument("--no-align", action="store_true", help="跳过zipalign对齐优化")
 
     # aar-to-dex命令
@@ -821,8 +1919,8 @@ def main():
 
     # jar-to-dex命令
     jar_to_dex_parser = subparsers.add_parser("jar-to-dex", help="将JAR文件转换为DEX文件")
-    jar_to_dex_parser.add_argument("-i", "--input", required=True, help="输入JAR文件路径")
-    jar_to_dex_parser.add_argument("-o", "--output", required=True, help="输出DEX文件路径")
+    jar_to_dex_parser.add_argument("-i", "--input", required=True, nargs="+", help="输入JAR文件路径（可多个，合并转换）")
+    jar_to_dex_parser.add_argument("-o", "--output", required=True, help="输出DEX文件路径（多个输入时为输出目录）")
 
     # dex-to-smali命令
     dex_to_smali_parser = subparsers.add_parser("dex-to-smali", help="将DEX文件反编译为Smali代码")
@@ -840,26 +1938,59 @@ def main():
         parser.print_help()
         return 1
 
+    level = logging.WARNING if args.quiet else logging.DEBUG if args.verbose else logging.INFO
+    batch = args.command in ("repack-many", "channel") or (args.command == "sign" and len(args.input) > 1)
+    listener = _setup_logging(level, queued=batch)
+
     try:
         if args.command == "build":
             repkg = ApkRepkg(apktool_path=args.apktool)
-            output = repkg.build(args.input, args.output)
+            output = repkg.build(args.input, args.output, force=args.force, fast=args.fast)
             print(f"\n输出: {output}")
 
         elif args.command == "sign":
             repkg = ApkRepkg()
-            output = repkg.sign(args.input, args.keystore, args.storepass, args.alias, args.keypass)
-            print(f"\n输出: {output}")
+            if len(args.input) == 1:
+                output = repkg.sign(args.input[0], args.keystore, args.storepass, args.alias, args.keypass)
+                print(f"\n输出: {output}")
+            else:
+                outputs = repkg.sign_batch(args.input, args.keystore, args.storepass, args.alias, args.keypass)
+                _flush_log(listener)
+                print("\n输出:")
+                for output in outputs:
+                    print(f"  {output}")
 
         elif args.command == "repack":
             repkg = ApkRepkg(apktool_path=args.apktool)
             output = repkg.repack(args.input, args.output, args.keystore, args.storepass, args.alias)
             print(f"\n输出: {output}")
 
+        elif args.command == "repack-many":
+            repkg = ApkRepkg(apktool_path=args.apktool)
+            jobs = [
+                (input_dir, os.path.join(args.output_dir, os.path.basename(os.path.normpath(input_dir)) + ".apk"))
+                for input_dir in args.input
+            ]
+            os.makedirs(args.output_dir, exist_ok=True)
+            outputs = asyncio.run(repkg.repack_many(jobs, args.keystore, args.storepass, args.alias,
+                                                    max_workers=args.jobs))
+            _flush_log(listener)
+            print("\n输出:")
+            for output in outputs:
+                print(f"  {output}")
+
+        elif args.command == "channel":
+            repkg = ApkRepkg()
+            outputs = repkg.multi_channel(args.input, args.channels, args.output_dir)
+            _flush_log(listener)
+            print("\n输出:")
+            for output in outputs:
+                print(f"  {output}")
+
         elif args.command == "zip-build":
             repkg = ApkRepkg()
             align = not getattr(args, 'no_align', False)
-            output = repkg.zip_build(args.input, args.output, align=align)
+            output = repkg.zip_build(args.input, args.output, align=align, fast=args.fast)
             print(f"\n输出: {output}")
 
         elif args.command == "repack-zip":
@@ -875,8 +2006,14 @@ def main():
 
         elif args.command == "jar-to-dex":
             repkg = ApkRepkg()
-            output = repkg.jar_to_dex(args.input, args.output)
-            print(f"\n输出: {output}")
+            if len(args.input) == 1:
+                output = repkg.jar_to_dex(args.input[0], args.output)
+                print(f"\n输出: {output}")
+            else:
+                outputs = repkg.jars_to_dex(args.input, args.output)
+                print("\n输出:")
+                for output in outputs:
+                    print(f"  {output}")
 
         elif args.command == "dex-to-smali":
             repkg = ApkRepkg()
@@ -890,7 +2027,7 @@ def main():
 
         return 0
 
-    except ApkRepkgError as e:
+    except (ApkRepkgError, ConfigError) as e:
         print(f"[错误] {e}", file=sys.stderr)
         return 1
     except KeyboardInterrupt:
@@ -901,22 +2038,27 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        if listener is not None:
+            listener.stop()
 
 
 if __name__ == "__main__":
     # PyCharm直接运行模式：使用config.py配置
     if len(sys.argv) == 1:
+        cfg = get_config()
+        _setup_logging()
         print("=" * 50)
         print("APK 重打包工具 - PyCharm 运行模式")
         print("=" * 50)
-        print(f"输入目录: {config.INPUT_DIR}")
-        print(f"输出APK:  {config.OUTPUT_APK}")
-        print(f"密钥库:   {config.DEFAULT_KEYSTORE}")
-        print(f"输入AAR:  {config.INPUT_AAR}")
-        print(f"输出DEX:  {config.OUTPUT_DEX}")
-        print(f"输入DEX:  {config.INPUT_DEX}")
-        print(f"输出Smali: {config.OUTPUT_SMALI_DIR}")
-        print(f"输入Smali: {config.INPUT_SMALI_DIR}")
+        print(f"输入目录: {cfg.input_dir}")
+        print(f"输出APK:  {cfg.output_apk}")
+        print(f"密钥库:   {cfg.default_keystore}")
+        print(f"输入AAR:  {cfg.input_aar}")
+        print(f"输出DEX:  {cfg.output_dex}")
+        print(f"输入DEX:  {cfg.input_dex}")
+        print(f"输出Smali: {cfg.output_smali_dir}")
+        print(f"输入Smali: {cfg.input_smali_dir}")
         print("=" * 50)
         print("\n请选择操作模式:")
         print("  1. apktool 方式 (repack) - 反编译目录 → apktool重建 → 签名")
@@ -934,40 +2076,40 @@ if __name__ == "__main__":
                 print("-" * 50)
                 repkg = ApkRepkg()
                 repkg.repack_zip(
-                    input_dir=config.INPUT_DIR,
-                    output_apk=config.OUTPUT_APK
+                    input_dir=cfg.input_dir,
+                    output_apk=cfg.output_apk
                 )
             elif choice == "3":
                 print("\n[模式] AAR 转 DEX")
                 print("-" * 50)
                 repkg = ApkRepkg()
                 repkg.aar_to_dex(
-                    aar_path=config.INPUT_AAR,
-                    output_dex=config.OUTPUT_DEX
+                    aar_path=cfg.input_aar,
+                    output_dex=cfg.output_dex
                 )
             elif choice == "4":
                 print("\n[模式] DEX 转 Smali")
                 print("-" * 50)
                 repkg = ApkRepkg()
                 repkg.dex_to_smali(
-                    dex_path=config.INPUT_DEX,
-                    output_dir=config.OUTPUT_SMALI_DIR
+                    dex_path=cfg.input_dex,
+                    output_dir=cfg.output_smali_dir
                 )
             elif choice == "5":
                 print("\n[模式] Smali 转 DEX")
                 print("-" * 50)
                 repkg = ApkRepkg()
                 repkg.smali_to_dex(
-                    smali_dir=config.INPUT_SMALI_DIR,
-                    output_dex=config.COMPILED_DEX
+                    smali_dir=cfg.input_smali_dir,
+                    output_dex=cfg.compiled_dex
                 )
             else:
                 print("\n[模式] apktool 方式重打包")
                 print("-" * 50)
                 repkg = ApkRepkg()
                 repkg.repack(
-                    input_dir=config.INPUT_DIR,
-                    output_apk=config.OUTPUT_APK
+                    input_dir=cfg.input_dir,
+                    output_apk=cfg.output_apk
                 )
 
         except Exception as e:
@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+APK 进程内签名
+不启动 JVM，直接用 Python 计算摘要并生成 V1（JAR）/ V2（APK Signature Scheme v2）签名，
+以及向已签名APK写入渠道号（不破坏签名）
+
+依赖 cryptography（可选依赖，未安装时使用 apksigner/jarsigner 签名）:
+    pip install cryptography
+JKS 格式的密钥库还需要 pyjks（PKCS12 格式不需要）:
+    pip install pyjks
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+    from cryptography.hazmat.primitives.serialization import pkcs7, pkcs12
+except ImportError:  # pragma: no cover - 可选依赖
+    x509 = None
+
+
+class ApkSignError(Exception):
+    """APK进程内签名异常"""
+    pass
+
+
+# ZIP 结构常量
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+_LOCAL_HEADER_SIG = 0x04034b50
+_CD_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+_CD_HEADER_SIG = 0x02014b50
+_EOCD = struct.Struct('<IHHHHIIH')
+_EOCD_SIG = 0x06054b50
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+# apksigner 使用的对齐扩展字段 ID
+_ALIGNMENT_EXTRA_ID = 0xd935
+
+# 新写入条目使用的固定 DOS 时间（1981-01-01 01:01:02），保证输出可复现
+_DOS_TIME = 0x0821
+_DOS_DATE = 0x0221
+
+# APK Signing Block
+_APK_SIG_BLOCK_MAGIC = b'APK Sig Block 42'
+_APK_SIGNATURE_SCHEME_V2_ID = 0x7109871a
+_SIG_RSA_PKCS1_V1_5_WITH_SHA256 = 0x0103
+_SIG_ECDSA_WITH_SHA256 = 0x0201
+_CHUNK_SIZE = 1024 * 1024
+
+# 渠道信息
+# V2 签名的APK: 写入 APK Signing Block 的 ID-value 对（与 Walle 兼容），签名块本身不参与 V2 摘要
+# 仅 V1 签名的APK: 写入 ZIP 注释（与 VasDolly 兼容），V1 签名不覆盖 ZIP 注释
+_CHANNEL_BLOCK_ID = 0x71777777
+_CHANNEL_COMMENT_MAGIC = b'ltlovezh'
+
+# 重新签名时需要移除的旧签名文件
+_V1_SIGNATURE_FILE = re.compile(r'^META-INF/([^/]+\.(SF|RSA|DSA|EC)|SIG-[^/]+|MANIFEST\.MF)$', re.IGNORECASE)
+
+
+class ZipEntry(NamedTuple):
+    """中央目录中的一个条目"""
+    name: str
+    flags: int
+    method: int
+    time: int
+    date: int
+    crc: int
+    compress_size: int
+    file_size: int
+    header_offset: int
+
+
+class SigningKey(NamedTuple):
+    """签名私钥及其证书（DER）"""
+    private_key: object
+    certificate: object
+    certificate_der: bytes
+
+
+def _require_cryptography() -> None:
+    if x509 is None:
+        raise ApkSignError("进程内签名需要 cryptography: pip install cryptography")
+
+
+def load_signing_key(keystore_path: str, storepass: str, alias: str,
+                     keypass: Optional[str] = None) -> SigningKey:
+    """
+    从密钥库加载签名私钥和证书
+
+    支持 PKCS12（keytool 默认格式，.jks 扩展名的文件也可能是 PKCS12）和 JKS（需要 pyjks）。
+
+    Args:
+        keystore_path: 密钥库文件路径
+        storepass: 密钥库密码
+        alias: 密钥别名（JKS 使用；PKCS12 取其中的私钥条目）
+        keypass: 密钥密码（默认与storepass相同）
+
+    Returns:
+        SigningKey
+    """
+    _require_cryptography()
+    keypass = keypass or storepass
+
+    with open(keystore_path, 'rb') as f:
+        data = f.read()
+
+    try:
+        key, cert, _ = pkcs12.load_key_and_certificates(data, storepass.encode('utf-8'))
+    except ValueError:
+        key, cert = _load_jks(data, storepass, alias, keypass)
+
+    if key is None or cert is None:
+        raise ApkSignError(f"密钥库中没有私钥或证书: {keystore_path}")
+    if not isinstance(key, (rsa.RSAPrivateKey, ec.EllipticCurvePrivateKey)):
+        raise ApkSignError(f"不支持的密钥类型: {type(key).__name__}（仅支持 RSA/EC）")
+
+    return SigningKey(key, cert, cert.public_bytes(serialization.Encoding.DER))
+
+
+def _load_jks(data: bytes, storepass: str, alias: str, keypass: str):
+    """使用 pyjks 读取 JKS 密钥库"""
+    try:
+        import jks
+    except ImportError:
+        raise ApkSignError("密钥库不是 PKCS12 格式，读取 JKS 需要 pyjks: pip install pyjks")
+
+    try:
+        keystore = jks.KeyStore.loads(data, storepass)
+    except Exception as e:
+        raise ApkSignError(f"读取密钥库失败: {e}")
+
+    entry = keystore.private_keys.get(alias)
+    if entry is None:
+        raise ApkSignError(f"密钥库中没有别名: {alias}")
+    if not entry.is_decrypted():
+        entry.decrypt(keypass)
+
+    key = serialization.load_der_private_key(entry.pkey_pkcs8, password=None)
+    cert = x509.load_der_x509_certificate(entry.cert_chain[0][1])
+    return key, cert
+
+
+def _find_eocd(data: bytes) -> int:
+    """查找 End of Central Directory 记录的偏移"""
+    # EOCD 固定 22 字节 + 最长 65535 字节注释
+    start = max(0, len(data) - _EOCD.size - 0xffff)
+    pos = data.rfind(struct.pack('<I', _EOCD_SIG), start)
+    while pos != -1:
+        comment_len = struct.unpack_from('<H', data, pos + 20)[0]
+        if pos + _EOCD.size + comment_len == len(data):
+            return pos
+        pos = data.rfind(struct.pack('<I', _EOCD_SIG), start, pos)
+    raise ApkSignError("不是有效的ZIP文件：找不到中央目录结束记录")
+
+
+def read_central_directory(data: bytes) -> Tuple[List[ZipEntry], int, int]:
+    """
+    解析 ZIP 中央目录
+
+    Args:
+        data: 整个 APK 的字节内容
+
+    Returns:
+        (条目列表, 中央目录偏移, EOCD 偏移)
+    """
+    eocd_offset = _find_eocd(data)
+    _, _, _, _, count, cd_size, cd_offset, _ = _EOCD.unpack_from(data, eocd_offset)
+    if cd_offset == 0xffffffff or count == 0xffff:
+        raise ApkSignError("不支持 ZIP64 格式的APK")
+
+    entries = []
+    pos = cd_offset
+    for _ in range(count):
+        (sig, _, _, flags, method, time, date, crc, csize, usize,
+         nlen, elen, clen, _, _, _, offset) = _CD_HEADER.unpack_from(data, pos)
+        if sig != _CD_HEADER_SIG:
+            raise ApkSignError(f"中央目录损坏: 偏移 {pos}")
+        name = data[pos + _CD_HEADER.size:pos + _CD_HEADER.size + nlen].decode('utf-8', 'surrogateescape')
+        entries.append(ZipEntry(name, flags, method, time, date, crc, csize, usize, offset))
+        pos += _CD_HEADER.size + nlen + elen + clen
+
+    return entries, cd_offset, eocd_offset
+
+
+def _entry_data_offset(data: bytes, entry: ZipEntry) -> int:
+    """条目压缩数据在文件中的起始偏移"""
+    sig, _, _, _, _, _, _, _, _, nlen, elen = _LOCAL_HEADER.unpack_from(data, entry.header_offset)
+    if sig != _LOCAL_HEADER_SIG:
+        raise ApkSignError(f"本地文件头损坏: {entry.name}")
+    return entry.header_offset + _LOCAL_HEADER.size + nlen + elen
+
+
+def iter_entry_content(data: bytes, entry: ZipEntry) -> Iterator[bytes]:
+    """按块返回条目解压后的内容"""
+    start = _entry_data_offset(data, entry)
+    raw = memoryview(data)[start:start + entry.compress_size]
+    if entry.method == 0:
+        for i in range(0, len(raw), _CHUNK_SIZE):
+            yield raw[i:i + _CHUNK_SIZE]
+    elif entry.method == 8:
+        decompressor = zlib.decompressobj(-15)
+        for i in range(0, len(raw), _CHUNK_SIZE):
+            yield decompressor.decompress(raw[i:i + _CHUNK_SIZE])
+        yield decompressor.flush()
+    else:
+        raise ApkSignError(f"不支持的压缩方式 {entry.method}: {entry.name}")
+
+
+def _entry_digest(data: bytes, entry: ZipEntry) -> str:
+    """条目内容的 SHA-256 摘要（base64）"""
+    digest = hashlib.sha256()
+    for chunk in iter_entry_content(data, entry):
+        digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode('ascii')
+
+
+def _manifest_line(key: str, value: str) -> bytes:
+    """生成 MANIFEST 行，超过 72 字节时按 JAR 规范折行"""
+    line = f'{key}: {value}'.encode('utf-8')
+    if len(line) <= 70:
+        return line + b'\r\n'
+    parts = [line[:70]]
+    for i in range(70, len(line), 69):
+        parts.append(b' ' + line[i:i + 69])
+    return b'\r\n'.join(parts) + b'\r\n'
+
+
+def _signer_name(alias: str) -> str:
+    """签名文件名（与 jarsigner 一致：别名大写，最多 8 个字符）"""
+    name = re.sub(r'[^A-Z0-9_-]', '_', alias.upper())[:8]
+    return name or 'CERT'
+
+
+def _build_v1_files(data: bytes, entries: List[ZipEntry], signing_key: SigningKey,
+                    signer_name: str, v2_enabled: bool) -> List[Tuple[str, bytes]]:
+    """生成 V1 签名的 MANIFEST.MF / .SF / 签名块文件"""
+    created_by = _manifest_line('Created-By', '1.0 (Android)')
+    manifest = [_manifest_line('Manifest-Version', '1.0') + created_by + b'\r\n']
+    sections = []
+    # sha256 与 zlib 解压在处理大块数据时会释放 GIL，条目间相互独立，可多线程并行计算；
+    # map 按输入顺序返回结果，保证 MANIFEST.MF 内容确定
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        digests = list(executor.map(lambda e: _entry_digest(data, e), entries))
+    for entry, entry_digest in zip(entries, digests):
+        section = (_manifest_line('Name', entry.name)
+                   + _manifest_line('SHA-256-Digest', entry_digest)
+                   + b'\r\n')
+        manifest.append(section)
+        sections.append((entry.name, section))
+    manifest_bytes = b''.join(manifest)
+
+    sf = [_manifest_line('Signature-Version', '1.0'), created_by,
+          _manifest_line('SHA-256-Digest-Manifest',
+                         base64.b64encode(hashlib.sha256(manifest_bytes).digest()).decode('ascii'))]
+    if v2_enabled:
+        # 防止 V2 签名被剥离后降级为仅 V1 校验
+        sf.append(_manifest_line('X-Android-APK-Signed', '2'))
+    sf.append(b'\r\n')
+    for name, section in sections:
+        sf.append(_manifest_line('Name', name)
+                  + _manifest_line('SHA-256-Digest', base64.b64encode(hashlib.sha256(section).digest()).decode('ascii'))
+                  + b'\r\n')
+    sf_bytes = b''.join(sf)
+
+    signature = (pkcs7.PKCS7SignatureBuilder()
+                 .set_data(sf_bytes)
+                 .add_signer(signing_key.certificate, signing_key.private_key, hashes.SHA256())
+                 .sign(serialization.Encoding.DER,
+                       [pkcs7.PKCS7Options.DetachedSignature, pkcs7.PKCS7Options.NoAttributes,
+                        pkcs7.PKCS7Options.Binary]))
+    block_ext = 'EC' if isinstance(signing_key.private_key, ec.EllipticCurvePrivateKey) else 'RSA'
+
+    return [
+        ('META-INF/MANIFEST.MF', manifest_bytes),
+        (f'META-INF/{signer_name}.SF', sf_bytes),
+        (f'META-INF/{signer_name}.{block_ext}', signature),
+    ]
+
+
+def _alignment_for(name: str, method: int, alignment: int, so_alignment: int) -> int:
+    """未压缩条目的对齐要求（默认参数下与 zipalign -p 4 一致）"""
+    if method != 0:
+        return 0
+    return so_alignment if name.endswith('.so') else alignment
+
+
+def _write_entries(out, data: bytes, entries: List[ZipEntry],
+                   new_files: List[Tuple[str, bytes]],
+                   alignment: int = 4, so_alignment: int = 4096) -> List[bytes]:
+    """
+    原样拷贝已有条目（不重新压缩），追加新文件，并对未压缩条目做对齐
+
+    Args:
+        alignment: 未压缩条目的对齐字节数
+        so_alignment: 未压缩 .so 的对齐字节数
+
+    Returns:
+        中央目录记录列表
+    """
+    central_directory = []
+    offset = 0
+
+    def _emit(name_bytes: bytes, flags: int, method: int, time: int, date: int,
+              crc: int, csize: int, usize: int, payload) -> None:
+        nonlocal offset
+        extra = b''
+        entry_alignment = _alignment_for(name_bytes.decode('utf-8', 'surrogateescape'), method,
+                                         alignment, so_alignment)
+        if entry_alignment:
+            data_start = offset + _LOCAL_HEADER.size + len(name_bytes) + 6
+            pad = (-data_start) % entry_alignment
+            extra = struct.pack('<HHH', _ALIGNMENT_EXTRA_ID, 2 + pad, entry_alignment) + b'\0' * pad
+        out.write(_LOCAL_HEADER.pack(_LOCAL_HEADER_SIG, 20, flags, method, time, date,
+                                     crc, csize, usize, len(name_bytes), len(extra)))
+        out.write(name_bytes)
+        out.write(extra)
+        out.write(payload)
+        central_directory.append(
+            _CD_HEADER.pack(_CD_HEADER_SIG, 20, 20, flags, method, time, date, crc, csize, usize,
+                            len(name_bytes), 0, 0, 0, 0, 0, offset) + name_bytes)
+        offset += _LOCAL_HEADER.size + len(name_bytes) + len(extra) + csize
+
+    view = memoryview(data)
+    for entry in entries:
+        start = _entry_data_offset(data, entry)
+        # 数据描述符的内容已在中央目录中，写入本地文件头后不再需要
+        flags = entry.flags & ~_DATA_DESCRIPTOR_FLAG
+        _emit(entry.name.encode('utf-8', 'surrogateescape'), flags, entry.method, entry.time, entry.date,
+              entry.crc, entry.compress_size, entry.file_size, view[start:start + entry.compress_size])
+
+    for name, content in new_files:
+        _emit(name.encode('utf-8'), 0x0800, 0, _DOS_TIME, _DOS_DATE,
+              zlib.crc32(content), len(content), len(content), content)
+
+    return central_directory
+
+
+def _lp(payload: bytes) -> bytes:
+    """uint32 长度前缀"""
+    return struct.pack('<I', len(payload)) + payload
+
+
+def _chunked_digest(sections: List[memoryview]) -> bytes:
+    """APK Signature Scheme v2 的分块 SHA-256 摘要"""
+    chunk_digests = []
+    for section in sections:
+        for i in range(0, len(section), _CHUNK_SIZE):
+            chunk = section[i:i + _CHUNK_SIZE]
+            digest = hashlib.sha256(b'\xa5' + struct.pack('<I', len(chunk)))
+            digest.update(chunk)
+            chunk_digests.append(digest.digest())
+    top = hashlib.sha256(b'\x5a' + struct.pack('<I', len(chunk_digests)))
+    for chunk_digest in chunk_digests:
+        top.update(chunk_digest)
+    return top.digest()
+
+
+def _build_v2_block(apk: bytes, cd_offset: int, eocd_offset: int, signing_key: SigningKey) -> bytes:
+    """生成包含 V2 签名的 APK Signing Block"""
+    view = memoryview(apk)
+    # 签名块插入在中央目录之前，计算摘要时 EOCD 中的中央目录偏移即为签名块的起始位置
+    digest = _chunked_digest([view[:cd_offset], view[cd_offset:eocd_offset], view[eocd_offset:]])
+
+    key = signing_key.private_key
+    if isinstance(key, ec.EllipticCurvePrivateKey):
+        algorithm = _SIG_ECDSA_WITH_SHA256
+    else:
+        algorithm = _SIG_RSA_PKCS1_V1_5_WITH_SHA256
+
+    signed_data = (_lp(_lp(struct.pack('<I', algorithm) + _lp(digest)))
+                   + _lp(_lp(signing_key.certificate_der))
+                   + _lp(b''))
+    if algorithm == _SIG_ECDSA_WITH_SHA256:
+        signature = key.sign(signed_data, ec.ECDSA(hashes.SHA256()))
+    else:
+        signature = key.sign(signed_data, padding.PKCS1v15(), hashes.SHA256())
+    public_key = key.public_key().public_bytes(serialization.Encoding.DER,
+                                               serialization.PublicFormat.SubjectPublicKeyInfo)
+
+    signer = _lp(signed_data) + _lp(_lp(struct.pack('<I', algorithm) + _lp(signature))) + _lp(public_key)
+    value = _lp(_lp(signer))
+
+    pair = struct.pack('<QI', 4 + len(value), _APK_SIGNATURE_SCHEME_V2_ID) + value
+    block_size = len(pair) + 8 + len(_APK_SIG_BLOCK_MAGIC)
+    return struct.pack('<Q', block_size) + pair + struct.pack('<Q', block_size) + _APK_SIG_BLOCK_MAGIC
+
+
+def sign_apk(apk_path: str, signing_key: SigningKey, alias: str,
+             v1_enabled: bool = True, v2_enabled: bool = True,
+             alignment: int = 4, so_alignment: int = 4096) -> str:
+    """
+    在进程内签名APK（原地替换）
+
+    移除已有的签名，未压缩条目按对齐规则（默认与 zipalign -p 4 一致）对齐后重新签名，
+    已有条目的压缩数据原样拷贝，不重新压缩。
+
+    Args:
+        apk_path: APK文件路径
+        signing_key: load_signing_key 返回的签名密钥
+        alias: 密钥别名（决定 V1 签名文件名）
+        v1_enabled: 是否生成 V1 签名
+        v2_enabled: 是否生成 V2 签名
+        alignment: 未压缩条目的对齐字节数
+        so_alignment: 未压缩 .so 的对齐字节数
+
+    Returns:
+        签名后的APK文件路径
+    """
+    _require_cryptography()
+    if not (v1_enabled or v2_enabled):
+        raise ApkSignError("至少需要启用一种签名方式")
+
+    with open(apk_path, 'rb') as f:
+        data = f.read()
+
+    entries, _, _ = read_central_directory(data)
+    entries = [e for e in entries if not _V1_SIGNATURE_FILE.match(e.name)]
+
+    new_files = []
+    if v1_enabled:
+        content_entries = [e for e in entries if not e.name.endswith('/')]
+        new_files = _build_v1_files(data, content_entries, signing_key, _signer_name(alias), v2_enabled)
+
+    temp_path = apk_path + '.signing'
+    try:
+        body = io.BytesIO()
+        central_directory = _write_entries(body, data, entries, new_files, alignment, so_alignment)
+        cd_offset = body.tell()
+        cd_bytes = b''.join(central_directory)
+        body.write(cd_bytes)
+        eocd_offset = body.tell()
+        body.write(_EOCD.pack(_EOCD_SIG, 0, 0, len(central_directory), len(central_directory),
+                              len(cd_bytes), cd_offset, 0))
+        apk = body.getvalue()
+
+        with open(temp_path, 'wb') as out:
+            if v2_enabled:
+                block = _build_v2_block(apk, cd_offset, eocd_offset, signing_key)
+                out.write(memoryview(apk)[:cd_offset])
+                out.write(block)
+                out.write(memoryview(apk)[cd_offset:eocd_offset])
+                out.write(_EOCD.pack(_EOCD_SIG, 0, 0, len(central_directory), len(central_directory),
+                                     len(cd_bytes), cd_offset + len(block), 0))
+            else:
+                out.write(apk)
+
+        os.replace(temp_path, apk_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return apk_path
+
+
+def _read_tail(f, file_size: int) -> Tuple[bytes, int]:
+    """读取文件尾部（包含 EOCD 的最大范围），返回 (尾部字节, 尾部起始偏移)"""
+    tail_start = max(0, file_size - _EOCD.size - 0xffff)
+    f.seek(tail_start)
+    return f.read(), tail_start
+
+
+def _read_signing_block(f, cd_offset: int) -> Optional[Tuple[int, List[Tuple[int, bytes]]]]:
+    """
+    读取中央目录之前的 APK Signing Block
+
+    Returns:
+        (签名块起始偏移, [(ID, value)]) ，没有签名块时返回 None
+    """
+    if cd_offset < 32:
+        return None
+    f.seek(cd_offset - 24)
+    footer = f.read(24)
+    if footer[8:] != _APK_SIG_BLOCK_MAGIC:
+        return None
+    block_size = struct.unpack('<Q', footer[:8])[0]
+    block_start = cd_offset - block_size - 8
+    f.seek(block_start)
+    block = f.read(block_size + 8)
+
+    pairs = []
+    pos = 8
+    end = len(block) - 24
+    while pos < end:
+        pair_len, pair_id = struct.unpack_from('<QI', block, pos)
+        pairs.append((pair_id, block[pos + 12:pos + 8 + pair_len]))
+        pos += 8 + pair_len
+    return block_start, pairs
+
+
+def _pack_signing_block(pairs: List[Tuple[int, bytes]]) -> bytes:
+    """根据 ID-value 对生成 APK Signing Block"""
+    body = b''.join(struct.pack('<QI', 4 + len(value), pair_id) + value for pair_id, value in pairs)
+    block_size = len(body) + 8 + len(_APK_SIG_BLOCK_MAGIC)
+    return struct.pack('<Q', block_size) + body + struct.pack('<Q', block_size) + _APK_SIG_BLOCK_MAGIC
+
+
+def write_channel(apk_path: str, channel: str) -> str:
+    """
+    向已签名的APK写入渠道号（原地修改，无需重新签名）
+
+    V2 签名的APK写入签名块，仅 V1 签名的APK写入 ZIP 注释；只改写文件尾部，不重写条目数据。
+
+    Args:
+        apk_path: 已签名的APK文件路径
+        channel: 渠道号
+
+    Returns:
+        APK文件路径
+    """
+    with open(apk_path, 'r+b') as f:
+        file_size = f.seek(0, os.SEEK_END)
+        tail, tail_start = _read_tail(f, file_size)
+        eocd_offset = tail_start + _find_eocd(tail)
+        eocd = bytearray(tail[eocd_offset - tail_start:eocd_offset - tail_start + _EOCD.size])
+        _, _, _, _, _, cd_size, cd_offset, _ = _EOCD.unpack(eocd)
+
+        signing_block = _read_signing_block(f, cd_offset)
+        if signing_block is not None:
+            block_start, pairs = signing_block
+            value = json.dumps({'channel': channel}, ensure_ascii=False).encode('utf-8')
+            pairs = [(i, v) for i, v in pairs if i != _CHANNEL_BLOCK_ID] + [(_CHANNEL_BLOCK_ID, value)]
+            block = _pack_signing_block(pairs)
+
+            f.seek(cd_offset)
+            central_directory = f.read(cd_size)
+            struct.pack_into('<I', eocd, 16, block_start + len(block))
+            f.seek(block_start)
+            f.write(block)
+            f.write(central_directory)
+            f.write(eocd)
+            f.write(tail[eocd_offset - tail_start + _EOCD.size:])
+        else:
+            payload = channel.encode('utf-8')
+            comment = payload + struct.pack('<H', len(payload)) + _CHANNEL_COMMENT_MAGIC
+            struct.pack_into('<H', eocd, 20, len(comment))
+            f.seek(eocd_offset)
+            f.write(eocd)
+            f.write(comment)
+        f.truncate()
+
+    return apk_path
+
+
+def read_channel(apk_path: str) -> Optional[str]:
+    """
+    读取 write_channel 写入的渠道号
+
+    Args:
+        apk_path: APK文件路径
+
+    Returns:
+        渠道号，未写入时返回 None
+    """
+    with open(apk_path, 'rb') as f:
+        file_size = f.seek(0, os.SEEK_END)
+        tail, tail_start = _read_tail(f, file_size)
+        eocd_offset = _find_eocd(tail)
+        _, _, _, _, _, _, cd_offset, comment_len = _EOCD.unpack_from(tail, eocd_offset)
+
+        signing_block = _read_signing_block(f, cd_offset)
+        if signing_block is not None:
+            for pair_id, value in signing_block[1]:
+                if pair_id == _CHANNEL_BLOCK_ID:
+                    return json.loads(value.decode('utf-8')).get('channel')
+            return None
+
+        comment = tail[eocd_offset + _EOCD.size:eocd_offset + _EOCD.size + comment_len]
+        if not comment.endswith(_CHANNEL_COMMENT_MAGIC):
+            return None
+        length_pos = len(comment) - len(_CHANNEL_COMMENT_MAGIC) - 2
+        length = struct.unpack_from('<H', comment, length_pos)[0]
+        return comment[length_pos - length:length_pos].decode('utf-8')
@@ -1,74 +1,398 @@
 """
 APK重打包工具配置文件
+
+下方的模块级常量是可编辑的默认配置；程序运行时通过 get_config() 获取只读的 ApkToolConfig，
+首次调用时读取一次（当前目录存在 apkrepack.yml 时用其中的值覆盖默认配置），之后不再变化。
 """
 
+import collections
+import dataclasses
+import functools
+import glob
+import os
+import sys
+import types
+from enum import IntEnum
+from typing import Final, FrozenSet, Iterator, Mapping, Optional, Tuple
+
+__all__ = [
+    'ApkToolConfig', 'ConfigError', 'PackingStrategy', 'Secret', 'SignMode', 'get_config',
+    'resolve_sdk_tool', 'APKTOOL_PATH', 'JAVA_PATH', 'JAVA_CDS_ENABLED', 'JAVA_CDS_DIR',
+    'SDK_ENV_VARS', 'SDK_FS_PATHS', 'APKTOOL_JVM_OPTS', 'APKTOOL_MAX_HEAP_GB', 'BATCH_PIN_CPUS',
+    'APKSIGNER_PATH', 'ZIPALIGN_PATH', 'SEVEN_ZIP_PATH', 'D8_PATH', 'ANDROID_JAR_PATH',
+    'DEFAULT_KEYSTORE', 'DEFAULT_ALIAS', 'DEFAULT_STOREPASS', 'SIGN_MODE', 'SIGN_ARGS',
+    'SIGN_BACKEND', 'INTERMEDIATE_DIR', 'ZIP_COMPRESS_LEVEL', 'ZIP_LEVEL_BY_EXT', 'ZIP_STORE_EXTENSIONS',
+    'ZIP_PACKING_STRATEGY', 'ZIPALIGN_ENABLED', 'ZIPALIGN_BYTES', 'ZIPALIGN_PAGE_ALIGN_SO',
+    'INPUT_DIR', 'OUTPUT_APK', 'INPUT_AAR', 'OUTPUT_DEX', 'INPUT_DEX', 'OUTPUT_SMALI_DIR',
+    'INPUT_SMALI_DIR', 'COMPILED_DEX', 'BAKSMALI_PATH', 'DEX2JAR_PATH', 'SMALI_PATH',
+    'TEMP_DIR_PREFIX', 'CONFIG_FILE', 'PROFILE_ENV_VAR', 'PROFILE_DIR',
+]
+
+
+class SignMode(IntEnum):
+    """签名方式"""
+    V1_ONLY = 1  # 仅V1签名(JAR签名), 兼容性最好但体积大
+    V2_ONLY = 2  # 仅V2签名(APK签名), 体积小, Android 7.0+
+    V1_V2 = 3  # V1+V2双签名, 兼容性和体积平衡
+
+
+class PackingStrategy(IntEnum):
+    """ZIP 打包策略"""
+    ALL = 1  # 全部压缩（resources.arsc 和 AndroidManifest.xml 除外）
+    PASSTHROUGH = 2  # ZIP_STORE_EXTENSIONS 中的文件原样存储，其余压缩
+
+
+class Secret(str):
+    """
+    敏感配置值（如密钥库密码）
+
+    与普通字符串用法相同，repr 时隐藏内容，避免随配置对象、日志或异常信息输出。
+    """
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "Secret('***')"
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml():
+    """
+    按需导入 PyYAML（可选依赖）
+
+    PyYAML 的导入耗时与本模块其余部分相当，只在确实存在覆盖配置文件或配置档案时才导入。
+
+    Returns:
+        yaml 模块，未安装时为 None
+    """
+    try:
+        import yaml
+    except ImportError:  # pragma: no cover - 可选依赖
+        return None
+    return yaml
+
+
 # apktool路径配置
-APKTOOL_PATH = "./tools/apktool_2.12.1.jar"  # 默认使用系统PATH中的apktool
+APKTOOL_PATH: Final[str] = "./tools/apktool_2.12.1.jar"  # 默认使用系统PATH中的apktool
 
 # Java路径配置
-JAVA_PATH = "java"  # 默认使用系统PATH中的java
+JAVA_PATH: Final[str] = "java"  # 默认使用系统PATH中的java
 
-# Android SDK路径（用于查找apksigner和zipalign）
-ANDROID_SDK_PATHS = [
-    "ANDROID_HOME",  # 环境变量
-    "ANDROID_SDK_ROOT",  # 环境变量
+# JVM 类数据共享（AppCDS）配置
+# apktool/d8/smali 等 jar 工具不支持常驻进程模式，每次调用都要冷启动 JVM；启用后首次运行会把已加载的类
+# 归档到 JAVA_CDS_DIR，之后的启动直接映射归档，减少 JVM 预热耗时（需 JDK 19+，旧版本自动忽略）
+JAVA_CDS_ENABLED: Final[bool] = True
+JAVA_CDS_DIR: Final[str] = "./tools/cds"
+
+# Android SDK路径（用于查找apksigner、zipalign和d8）
+# 下方配置的工具路径不存在时，先依次读取环境变量、再依次检查默认安装目录，
+# 在第一个包含该工具的 SDK 的 build-tools 中取最新版本（见 resolve_sdk_tool）
+SDK_ENV_VARS: Final[Tuple[str, ...]] = ("ANDROID_HOME", "ANDROID_SDK_ROOT")  # 指向 SDK 根目录的环境变量
+SDK_FS_PATHS: Final[Tuple[str, ...]] = (
     "~/Android/Sdk",  # Linux默认路径
     "~/Library/Android/sdk",  # macOS默认路径
     "C:\\dev\\android\\sdk",  # Windows默认路径
-]
+)
+
+# apktool JVM 参数
+APKTOOL_JVM_OPTS: Final[Tuple[str, ...]] = ("-XX:+UseParallelGC",)  # 吞吐量优先的GC，打包是批处理任务，不在意停顿
+APKTOOL_MAX_HEAP_GB: Final[int] = 8  # 反编译目录大小的2倍超过 JVM 默认最大堆（物理内存的1/4）时提高 apktool 的堆，不超过此上限
+
+# 批量打包时把每个 apktool 进程绑定到一组独立的 CPU 核（仅 Linux，需要 taskset）
+BATCH_PIN_CPUS: Final[bool] = True
 
 # apksigner路径配置
-APKSIGNER_PATH = "C:\\dev\\android\\sdk\\build-tools\\28.0.3\\apksigner.bat"  # Windows使用.bat文件
+APKSIGNER_PATH: Final[str] = "C:\\dev\\android\\sdk\\build-tools\\28.0.3\\apksigner.bat"  # Windows使用.bat文件；不存在时在SDK中查找
 
 # zipalign路径配置
-ZIPALIGN_PATH = "./tools/zipalign.exe"  # 默认使用系统PATH中的zipalign，可指定完整路径
+ZIPALIGN_PATH: Final[str] = "./tools/zipalign.exe"  # 默认使用系统PATH中的zipalign，可指定完整路径；不存在时在SDK中查找
 
 # 7z 路径配置（用于ZIP打包，比Python zipfile更高效）
-SEVEN_ZIP_PATH = "C:\\dev\\setup\\tools\\7-Zip\\7z.exe"  # Windows: "7z" 或完整路径如 "C:\\Program Files\\7-Zip\\7z.exe"
+SEVEN_ZIP_PATH: Final[str] = "C:\\dev\\setup\\tools\\7-Zip\\7z.exe"  # Windows: "7z" 或完整路径如 "C:\\Program Files\\7-Zip\\7z.exe"
 
 # d8 工具路径配置（用于 DEX 转换，支持 JAR/AAR 转 DEX）
-D8_PATH = "C:\\dev\\android\\sdk\\build-tools\\28.0.3\\d8.bat"  # Windows: d8.bat，Linux/Mac: d8
+D8_PATH: Final[str] = "C:\\dev\\android\\sdk\\build-tools\\28.0.3\\d8.bat"  # Windows: d8.bat，Linux/Mac: d8，也可为 d8.jar；不存在时在SDK中查找
 
 # android.jar 路径配置（d8 转换时的 boot classpath）
-ANDROID_JAR_PATH = "C:\\dev\\android\\sdk\\platforms\\android-28\\android.jar"
+ANDROID_JAR_PATH: Final[Optional[str]] = "C:\\dev\\android\\sdk\\platforms\\android-28\\android.jar"
 
 # 默认签名配置
-DEFAULT_KEYSTORE = "./tools/test.jks"
-DEFAULT_ALIAS = "testkey"
-DEFAULT_STOREPASS = "test001"  # 密钥库密码
+DEFAULT_KEYSTORE: Final[str] = "./tools/test.jks"
+DEFAULT_ALIAS: Final[str] = "testkey"
+DEFAULT_STOREPASS: Final[Secret] = Secret("test001")  # 密钥库密码
+
+# 签名方式配置（说明见 SignMode；apkrepack.yml 中写名称，如 SIGN_MODE: V1_V2）
+SIGN_MODE: Final[SignMode] = SignMode.V2_ONLY  # 可选: SignMode.V1_ONLY, SignMode.V2_ONLY, SignMode.V1_V2
+
+# 各签名方式对应的 apksigner 参数（只读，签名时直接展开到命令行）
+SIGN_ARGS: Final[Mapping[SignMode, Tuple[str, ...]]] = types.MappingProxyType({
+    SignMode.V1_ONLY: ("--v1-signing-enabled", "true", "--v2-signing-enabled", "false"),
+    SignMode.V2_ONLY: ("--v1-signing-enabled", "false", "--v2-signing-enabled", "true"),
+    SignMode.V1_V2: ("--v1-signing-enabled", "true", "--v2-signing-enabled", "true"),
+})
 
-# 签名方式配置
-# V1_ONLY: 仅V1签名(JAR签名), 兼容性最好但体积大
-# V2_ONLY: 仅V2签名(APK签名), 体积小, Android 7.0+
-# V1_V2: V1+V2双签名, 兼容性和体积平衡
-SIGN_MODE = "V2_ONLY"  # 可选: "V1_ONLY", "V2_ONLY", "V1_V2"
+# 签名实现
+# apksigner: 调用 apksigner（不可用时回退 jarsigner），每次签名启动一个 JVM
+# python: 进程内签名（apk_signer.py），不启动 JVM，需要 pip install cryptography
+SIGN_BACKEND: Final[str] = "apksigner"  # 可选: "apksigner", "python"
+
+# 重打包流程（repack / repack-zip）的中间文件目录
+# 打包→对齐→签名过程中的APK放在内存文件系统中，完成后再移动到输出路径，避免中间文件写入磁盘后又立即读回；
+# 目录不存在（如 Windows）或剩余空间不足 1GB 时直接在输出目录中处理，设为 None 关闭
+INTERMEDIATE_DIR: Final[Optional[str]] = "/dev/shm"
 
 # ZIP打包配置
-ZIP_COMPRESS_LEVEL = 9  # ZIP压缩级别 (0-9, 9=最高压缩)
-ZIPALIGN_ENABLED = True  # 是否启用zipalign对齐优化
+ZIP_COMPRESS_LEVEL: Final[int] = 6  # ZIP压缩级别 (0-9, 9=最高压缩；6 之后体积收益很小而耗时成倍增加)
+# 按扩展名单独指定压缩级别，未列出的扩展名使用 ZIP_COMPRESS_LEVEL；0 表示以 STORE 方式存储。
+# 只对压缩的条目生效，ZIP_STORE_EXTENSIONS 中的扩展名在 PASSTHROUGH 策略下始终不压缩。
+# 默认为空：使用 7z 打包时每多一种级别就多一次 7z a 调用（每次都会重写整个 ZIP），
+# 例如 {".xml": 9}（APK 中的 xml 是二进制 AXML，提高级别几乎不变小）
+ZIP_LEVEL_BY_EXT: Final[Mapping[str, int]] = types.MappingProxyType({})
+# 以 STORE 方式（不压缩）存储的扩展名：已压缩的媒体格式再 DEFLATE 几乎不变小，
+# dex/so/arsc 不压缩时可在安装后直接 mmap（resources.arsc 在 targetSdk 30+ 必须不压缩）
+ZIP_STORE_EXTENSIONS: Final[FrozenSet[str]] = frozenset({
+    ".dex", ".so", ".arsc", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ogg", ".mp3", ".mp4",
+})
+# 打包策略（说明见 PackingStrategy）
+ZIP_PACKING_STRATEGY: Final[PackingStrategy] = PackingStrategy.PASSTHROUGH  # 可选: PackingStrategy.PASSTHROUGH, PackingStrategy.ALL
+ZIPALIGN_ENABLED: Final[bool] = True  # 是否启用zipalign对齐优化
+ZIPALIGN_BYTES: Final[int] = 4  # 未压缩条目的对齐字节数（zipalign 的 align 参数）
+ZIPALIGN_PAGE_ALIGN_SO: Final[bool] = True  # 未压缩的 .so 按 4096 字节页对齐（zipalign -p），便于系统直接 mmap 加载
 
 # PyCharm直接运行时的配置
-INPUT_DIR = "./apk/app"  # 反编译后的目录路径
-OUTPUT_APK = "./output/app2.apk"  # 输出APK路径
+INPUT_DIR: Final[str] = "./apk/app"  # 反编译后的目录路径
+OUTPUT_APK: Final[str] = "./output/app2.apk"  # 输出APK路径
 
 # AAR 转 DEX 配置
-INPUT_AAR = "./aar/PluginJar.aar"  # 输入AAR文件路径
-OUTPUT_DEX = "./output/classes.dex"  # 输出DEX文件路径
+INPUT_AAR: Final[str] = "./aar/PluginJar.aar"  # 输入AAR文件路径
+OUTPUT_DEX: Final[str] = "./output/classes.dex"  # 输出DEX文件路径
 
 # DEX 反编译/编译配置
-INPUT_DEX = "./dex/classes.dex"  # 输入DEX文件路径
-OUTPUT_SMALI_DIR = "./smali/out"  # 输出Smali目录路径
-INPUT_SMALI_DIR = "./smali/out"  # 输入Smali目录路径（用于编译）
-COMPILED_DEX = "./output/compiled.dex"  # 编译后的DEX文件路径
+INPUT_DEX: Final[str] = "./dex/classes.dex"  # 输入DEX文件路径
+OUTPUT_SMALI_DIR: Final[str] = "./smali/out"  # 输出Smali目录路径
+INPUT_SMALI_DIR: Final[str] = "./smali/out"  # 输入Smali目录路径（用于编译）
+COMPILED_DEX: Final[str] = "./output/compiled.dex"  # 编译后的DEX文件路径
 
 # baksmali/dex2jar 工具路径配置（DEX 反编译）
 # 选项1: baksmali (将 DEX 反编译为 Smali 代码)
-BAKSMALI_PATH = "./tools/baksmali-2.1.3.jar"  # baksmali.jar 路径
+BAKSMALI_PATH: Final[str] = "./tools/baksmali-2.1.3.jar"  # baksmali.jar 路径
 # 选项2: dex2jar (将 DEX 转换为 JAR，可用 JD-GUI 查看)
-DEX2JAR_PATH = "./tools/dex2jar.jar"  # d2j-dex2jar.bat 或 dex2jar.jar 路径
+DEX2JAR_PATH: Final[str] = "./tools/dex2jar.jar"  # d2j-dex2jar.bat 或 dex2jar.jar 路径
 
 # smali 工具路径配置（Smali 代码编译为 DEX）
-SMALI_PATH = "./tools/smali-2.1.3.jar"  # smali.jar 路径
+SMALI_PATH: Final[str] = "./tools/smali-2.1.3.jar"  # smali.jar 路径
+
+# 临时文件配置（临时工作目录优先创建在 INTERMEDIATE_DIR 中）
+TEMP_DIR_PREFIX: Final[str] = "apk_repack_"
+
+
+class ConfigError(ValueError):
+    """配置错误（覆盖配置文件或配置档案无效）"""
+
+
+# 覆盖配置文件（YAML，键为上方的常量名，大小写均可；需要 pip install pyyaml）
+CONFIG_FILE: Final[str] = "apkrepack.yml"
+
+# 配置档案：环境变量 APK_REPACK_PROFILE=<名称> 时加载 PROFILE_DIR/<名称>.yml（如 win、ci、dev），
+# 优先级：当前目录的 CONFIG_FILE > 配置档案 > 上方默认值
+PROFILE_ENV_VAR: Final[str] = "APK_REPACK_PROFILE"
+PROFILE_DIR: Final[str] = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ApkToolConfig:
+    """运行时只读配置，字段与上方同名常量一一对应（小写）"""
+    apktool_path: str = APKTOOL_PATH
+    java_path: str = JAVA_PATH
+    java_cds_enabled: bool = JAVA_CDS_ENABLED
+    java_cds_dir: str = JAVA_CDS_DIR
+    sdk_env_vars: Tuple[str, ...] = SDK_ENV_VARS
+    sdk_fs_paths: Tuple[str, ...] = SDK_FS_PATHS
+    apktool_jvm_opts: Tuple[str, ...] = APKTOOL_JVM_OPTS
+    apktool_max_heap_gb: int = APKTOOL_MAX_HEAP_GB
+    batch_pin_cpus: bool = BATCH_PIN_CPUS
+    apksigner_path: str = APKSIGNER_PATH
+    zipalign_path: str = ZIPALIGN_PATH
+    seven_zip_path: str = SEVEN_ZIP_PATH
+    d8_path: str = D8_PATH
+    android_jar_path: Optional[str] = ANDROID_JAR_PATH
+    default_keystore: str = DEFAULT_KEYSTORE
+    default_alias: str = DEFAULT_ALIAS
+    default_storepass: Secret = DEFAULT_STOREPASS
+    sign_mode: SignMode = SIGN_MODE
+    sign_backend: str = SIGN_BACKEND
+    intermediate_dir: Optional[str] = INTERMEDIATE_DIR
+    zip_compress_level: int = ZIP_COMPRESS_LEVEL
+    # MappingProxyType 不可哈希，dataclass 不允许直接作为默认值
+    zip_level_by_ext: Mapping[str, int] = dataclasses.field(default_factory=lambda: ZIP_LEVEL_BY_EXT)
+    zip_store_extensions: FrozenSet[str] = ZIP_STORE_EXTENSIONS
+    zip_packing_strategy: PackingStrategy = ZIP_PACKING_STRATEGY
+    zipalign_enabled: bool = ZIPALIGN_ENABLED
+    zipalign_bytes: int = ZIPALIGN_BYTES
+    zipalign_page_align_so: bool = ZIPALIGN_PAGE_ALIGN_SO
+    input_dir: str = INPUT_DIR
+    output_apk: str = OUTPUT_APK
+    input_aar: str = INPUT_AAR
+    output_dex: str = OUTPUT_DEX
+    input_dex: str = INPUT_DEX
+    output_smali_dir: str = OUTPUT_SMALI_DIR
+    input_smali_dir: str = INPUT_SMALI_DIR
+    compiled_dex: str = COMPILED_DEX
+    baksmali_path: str = BAKSMALI_PATH
+    dex2jar_path: str = DEX2JAR_PATH
+    smali_path: str = SMALI_PATH
+    temp_dir_prefix: str = TEMP_DIR_PREFIX
+
+
+# 启动时的工作目录：配置中的相对路径都相对于它解析，只调用一次 getcwd
+_CWD: Final[str] = os.getcwd()
+
+# 工具与文件路径字段：get_config() 构建时统一展开 ~ 并转为绝对路径（不带目录的命令名如 "java"、"7z" 保持原样，
+# 运行时在 PATH 中查找），之后每次启动子进程直接复用，不再重复 expanduser/abspath
+_PATH_FIELDS: Final = (
+    'apktool_path', 'java_path', 'java_cds_dir', 'apksigner_path', 'zipalign_path', 'seven_zip_path',
+    'd8_path', 'android_jar_path', 'default_keystore', 'baksmali_path', 'dex2jar_path', 'smali_path',
+    'intermediate_dir',
+)
+
+
+def _normalize_path(path: Optional[str]) -> Optional[str]:
+    """展开 ~ 并转为绝对路径（驻留字符串）；不带目录的命令名原样返回"""
+    if not path:
+        return path
+    path = os.path.expanduser(path)
+    if os.path.dirname(path):
+        path = os.path.normpath(os.path.join(_CWD, path))
+    return sys.intern(path)
+
+
+def _to_enum(enum_cls, value, key: str):
+    """配置值转为枚举成员，同时接受成员本身和大小写不敏感的名称（YAML 或旧版字符串配置）"""
+    if isinstance(value, enum_cls):
+        return value
+    try:
+        return enum_cls[str(value).upper()]
+    except KeyError:
+        choices = ', '.join(member.name for member in enum_cls)
+        raise ConfigError(f"{key} 无效: {value}（可选: {choices}）") from None
+
+
+def _to_level_table(value, key: str) -> Mapping[str, int]:
+    """校验按扩展名的压缩级别表（YAML 中为普通字典），返回只读映射"""
+    if not isinstance(value, Mapping):
+        raise ConfigError(f"{key} 必须是 扩展名 -> 压缩级别 的映射: {value!r}")
+    for ext, level in value.items():
+        if not isinstance(level, int) or isinstance(level, bool) or not 0 <= level <= 9:
+            raise ConfigError(f"{key} 中 {ext} 的压缩级别无效: {level!r}（可选: 0-9）")
+    return types.MappingProxyType(dict(value))
+
+
+def _load_overrides(path: str) -> dict:
+    """
+    读取覆盖配置文件
+
+    Args:
+        path: YAML 文件路径
+
+    Returns:
+        字段名 -> 值；文件不存在时为空
+    """
+    if not os.path.isfile(path):
+        return {}
+    yaml = _yaml()
+    if yaml is None:
+        # 与配置档案相同，文件存在却无法读取时报错，不静默忽略用户的覆盖配置
+        raise ConfigError(f"{path}: 读取覆盖配置需要 pip install pyyaml")
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path} 顶层必须是键值映射")
+
+    names = {field.name for field in dataclasses.fields(ApkToolConfig)}
+    overrides = {}
+    for key, value in data.items():
+        name = str(key).lower()
+        if name not in names:
+            raise ConfigError(f"{path} 中存在未知配置项: {key}")
+        # 列表转为元组，保证配置对象整体不可变
+        overrides[name] = tuple(value) if isinstance(value, list) else value
+    return overrides
+
+
+def _load_profile() -> dict:
+    """
+    读取 APK_REPACK_PROFILE 指定的配置档案
+
+    Returns:
+        字段名 -> 值；未设置环境变量时为空
+    """
+    profile = os.environ.get(PROFILE_ENV_VAR)
+    if not profile:
+        return {}
+    path = os.path.join(PROFILE_DIR, f"{profile}.yml")
+    if not os.path.isfile(path):
+        raise ConfigError(f"{PROFILE_ENV_VAR}={profile}: 配置档案不存在: {path}")
+    if _yaml() is None:
+        raise ConfigError(f"{PROFILE_ENV_VAR}={profile}: 读取配置档案需要 pip install pyyaml")
+    return _load_overrides(path)
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> ApkToolConfig:
+    """
+    获取运行时配置（进程内只构建一次）
+
+    Returns:
+        ApkToolConfig 实例
+    """
+    overrides = collections.ChainMap(_load_overrides(os.path.join(_CWD, CONFIG_FILE)), _load_profile())
+    cfg = ApkToolConfig(**overrides)
+    return dataclasses.replace(
+        cfg,
+        sign_mode=_to_enum(SignMode, cfg.sign_mode, 'SIGN_MODE'),
+        zip_packing_strategy=_to_enum(PackingStrategy, cfg.zip_packing_strategy, 'ZIP_PACKING_STRATEGY'),
+        zip_level_by_ext=_to_level_table(cfg.zip_level_by_ext, 'ZIP_LEVEL_BY_EXT'),
+        default_storepass=Secret(cfg.default_storepass),
+        **{name: _normalize_path(getattr(cfg, name)) for name in _PATH_FIELDS},
+    )
+
+
+def _sdk_roots(cfg: ApkToolConfig) -> Iterator[str]:
+    """候选 SDK 根目录：先是 SDK_ENV_VARS 中已设置的环境变量，再是展开 ~ 后的 SDK_FS_PATHS"""
+    for name in cfg.sdk_env_vars:
+        root = os.environ.get(name)
+        if root:
+            yield root
+    for path in cfg.sdk_fs_paths:
+        yield os.path.expanduser(path)
+
+
+def _version_key(path: str) -> Tuple[int, ...]:
+    """build-tools 版本目录名（如 34.0.0、28.0.3）转为可比较的元组，无法解析的排在最后"""
+    version = os.path.basename(os.path.dirname(path))
+    try:
+        return tuple(int(part) for part in version.split('-')[0].split('.'))
+    except ValueError:
+        return ()
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_sdk_tool(name: str) -> Optional[str]:
+    """
+    在 Android SDK 的 build-tools 中查找工具（进程内缓存结果）
+
+    按 _sdk_roots 的顺序，取第一个包含该工具的 SDK 中最新版本的 build-tools；
+    Windows 下查找 name.bat / name.exe。
+
+    Args:
+        name: 工具名，如 "apksigner"、"zipalign"、"d8"
 
-# 临时文件配置
-TEMP_DIR_PREFIX = "apk_repack_"
+    Returns:
+        工具的绝对路径，找不到时为 None
+    """
+    names = {f'{name}.bat', f'{name}.exe'} if os.name == 'nt' else {name}
+    for root in _sdk_roots(get_config()):
+        matches = [path for path in glob.glob(os.path.join(glob.escape(root), 'build-tools', '*', f'{name}*'))
+                   if os.path.basename(path) in names and os.path.isfile(path)]
+        if matches:
+            return os.path.abspath(max(matches, key=_version_key))
+    return None
@@ -0,0 +1,118 @@
+"""config.py 的类型存根：模块级配置常量均为 Final，运行时通过 get_config() 读取只读配置"""
+
+import dataclasses
+import functools
+from enum import IntEnum
+from typing import Final, FrozenSet, Iterator, Mapping, Optional, Tuple
+
+
+class SignMode(IntEnum):
+    V1_ONLY = 1
+    V2_ONLY = 2
+    V1_V2 = 3
+
+
+class PackingStrategy(IntEnum):
+    ALL = 1
+    PASSTHROUGH = 2
+
+
+class Secret(str): ...
+
+
+APKTOOL_PATH: Final[str]
+JAVA_PATH: Final[str]
+JAVA_CDS_ENABLED: Final[bool]
+JAVA_CDS_DIR: Final[str]
+SDK_ENV_VARS: Final[Tuple[str, ...]]
+SDK_FS_PATHS: Final[Tuple[str, ...]]
+APKTOOL_JVM_OPTS: Final[Tuple[str, ...]]
+APKTOOL_MAX_HEAP_GB: Final[int]
+BATCH_PIN_CPUS: Final[bool]
+APKSIGNER_PATH: Final[str]
+ZIPALIGN_PATH: Final[str]
+SEVEN_ZIP_PATH: Final[str]
+D8_PATH: Final[str]
+ANDROID_JAR_PATH: Final[Optional[str]]
+DEFAULT_KEYSTORE: Final[str]
+DEFAULT_ALIAS: Final[str]
+DEFAULT_STOREPASS: Final[Secret]
+SIGN_MODE: Final[SignMode]
+SIGN_ARGS: Final[Mapping[SignMode, Tuple[str, ...]]]
+SIGN_BACKEND: Final[str]
+INTERMEDIATE_DIR: Final[Optional[str]]
+ZIP_COMPRESS_LEVEL: Final[int]
+ZIP_LEVEL_BY_EXT: Final[Mapping[str, int]]
+ZIP_STORE_EXTENSIONS: Final[FrozenSet[str]]
+ZIP_PACKING_STRATEGY: Final[PackingStrategy]
+ZIPALIGN_ENABLED: Final[bool]
+ZIPALIGN_BYTES: Final[int]
+ZIPALIGN_PAGE_ALIGN_SO: Final[bool]
+INPUT_DIR: Final[str]
+OUTPUT_APK: Final[str]
+INPUT_AAR: Final[str]
+OUTPUT_DEX: Final[str]
+INPUT_DEX: Final[str]
+OUTPUT_SMALI_DIR: Final[str]
+INPUT_SMALI_DIR: Final[str]
+COMPILED_DEX: Final[str]
+BAKSMALI_PATH: Final[str]
+DEX2JAR_PATH: Final[str]
+SMALI_PATH: Final[str]
+TEMP_DIR_PREFIX: Final[str]
+CONFIG_FILE: Final[str]
+PROFILE_ENV_VAR: Final[str]
+PROFILE_DIR: Final[str]
+
+
+class ConfigError(ValueError): ...
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ApkToolConfig:
+    apktool_path: str = ...
+    java_path: str = ...
+    java_cds_enabled: bool = ...
+    java_cds_dir: str = ...
+    sdk_env_vars: Tuple[str, ...] = ...
+    sdk_fs_paths: Tuple[str, ...] = ...
+    apktool_jvm_opts: Tuple[str, ...] = ...
+    apktool_max_heap_gb: int = ...
+    batch_pin_cpus: bool = ...
+    apksigner_path: str = ...
+    zipalign_path: str = ...
+    seven_zip_path: str = ...
+    d8_path: str = ...
+    android_jar_path: Optional[str] = ...
+    default_keystore: str = ...
+    default_alias: str = ...
+    default_storepass: Secret = ...
+    sign_mode: SignMode = ...
+    sign_backend: str = ...
+    intermediate_dir: Optional[str] = ...
+    zip_compress_level: int = ...
+    zip_level_by_ext: Mapping[str, int] = ...
+    zip_store_extensions: FrozenSet[str] = ...
+    zip_packing_strategy: PackingStrategy = ...
+    zipalign_enabled: bool = ...
+    zipalign_bytes: int = ...
+    zipalign_page_align_so: bool = ...
+    input_dir: str = ...
+    output_apk: str = ...
+    input_aar: str = ...
+    output_dex: str = ...
+    input_dex: str = ...
+    output_smali_dir: str = ...
+    input_smali_dir: str = ...
+    compiled_dex: str = ...
+    baksmali_path: str = ...
+    dex2jar_path: str = ...
+    smali_path: str = ...
+    temp_dir_prefix: str = ...
+
+
+get_config: functools._lru_cache_wrapper[ApkToolConfig]
+resolve_sdk_tool: functools._lru_cache_wrapper[Optional[str]]
+
+
+def _sdk_roots(cfg: ApkToolConfig) -> Iterator[str]: ...